@@ -1,12 +1,21 @@
+import functools
+import threading
 from kittentts import KittenTTS
 import soundfile as sf
 from functions.audio import normalize_audio
 from config import DEVICE
 
+_MODEL_LOCK = threading.Lock()
+
 # Kitten has "mini" and "nano" variants.
+# Loaded once and reused rather than re-created for every utterance.
+@functools.lru_cache(maxsize=None)
+def _get_model():
+    return KittenTTS("KittenML/kitten-tts-nano-0.2")
+
 def kitten_process_audio(voice, lang, text, output):
-    m = KittenTTS("KittenML/kitten-tts-nano-0.2")
-    audio = m.generate(text, voice)
+    with _MODEL_LOCK:
+        audio = _get_model().generate(text, voice)
 
     # Save the audio
     sf.write(output, audio, 24000)
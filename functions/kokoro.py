@@ -12,24 +12,84 @@ os.environ['HF_HUB_DISABLE_TELEMETRY'] = '1'
 if not os.environ.get('HF_TOKEN'):
     os.environ['HF_HUB_OFFLINE'] = '1'
 
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from kokoro import KPipeline
+import numpy as np
 import soundfile as sf
 import torch
 from functions.audio import normalize_audio
 from config import DEVICE
 
+KOKORO_SAMPLE_RATE = 24000
+# 2 ms fades at segment joins so consecutive segments don't click
+FADE_SAMPLES = KOKORO_SAMPLE_RATE * 2 // 1000
+_DONE = object()
+
+def _iter_one_ahead(iterable):
+    """Yield items while a worker thread is already generating the next one."""
+    iterator = iter(iterable)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        ahead = pool.submit(next, iterator, _DONE)
+        while True:
+            item = ahead.result()
+            if item is _DONE:
+                return
+            ahead = pool.submit(next, iterator, _DONE)
+            yield item
+
+def _write_segments(generator, output):
+    """
+    Write every segment the pipeline yields to one WAV. Synthesis of segment
+    N+1 overlaps writing segment N, and each join gets a short fade.
+    """
+    with sf.SoundFile(output, 'w', samplerate=KOKORO_SAMPLE_RATE, channels=1, subtype='PCM_16') as f:
+        for _, _, audio in _iter_one_ahead(generator):
+            if audio is None:
+                continue
+            if isinstance(audio, torch.Tensor):
+                audio = audio.detach().cpu().numpy()
+            audio = np.array(audio, dtype=np.float32)
+            fade = min(FADE_SAMPLES, len(audio) // 2)
+            if fade:
+                ramp = np.linspace(0.0, 1.0, fade, dtype=np.float32)
+                audio[:fade] *= ramp
+                audio[-fade:] *= ramp[::-1]
+            f.write(audio)
+
+# Pipelines are loaded once per language and reused across requests instead
+# of reloading the model on every call. The lock keeps concurrent requests
+# from sharing one pipeline's G2P/model state at the same time.
+_PIPELINE_LOCK = threading.Lock()
+
+@functools.lru_cache(maxsize=None)
+def _get_pipeline(lang):
+    # Explicitly pass repo_id to suppress warning
+    return KPipeline(lang, device=DEVICE, repo_id='hexgrad/Kokoro-82M')
+
 def kokoro_process_audio(voice, lang, text, output):
 
     # If we don't have a set lang, the first letter of the voice name will tell us.
     if lang == False:
         lang = voice[0]
     
-    # Explicitly pass repo_id to suppress warning
-    pipeline = KPipeline(lang, device=DEVICE, repo_id='hexgrad/Kokoro-82M')
-    generator = pipeline(text, voice)
-
-    for i, (gs, ps, audio) in enumerate(generator):
-        sf.write(f'{output}', audio, 24000)
+    with _PIPELINE_LOCK:
+        pipeline = _get_pipeline(lang)
+        _write_segments(pipeline(text, voice), output)
 
     # Normalize the audio
-    normalize_audio(output)
\ No newline at end of file
+    normalize_audio(output)
+
+def kokoro_process_audio_batch(voice, lang, items):
+    """Synthesize several (text, output) pairs, holding the pipeline for the whole batch."""
+    if lang == False:
+        lang = voice[0]
+
+    with _PIPELINE_LOCK:
+        pipeline = _get_pipeline(lang)
+        for text, output in items:
+            _write_segments(pipeline(text, voice), output)
+
+    for text, output in items:
+        normalize_audio(output)
@@ -17,6 +17,7 @@ from functions.routes import (
     SynthesizeRequest, 
     Voice,
     AUDIO_CACHE_DIR,
+    is_audio_cached,
 )
 import functions.gemini
 
@@ -130,7 +131,7 @@ async def generate_speech(request: SpeechRequest, background_tasks: BackgroundTa
     output_filename = f"{unique_hash}.{request.response_format}"
     output_path = os.path.join(AUDIO_CACHE_DIR, output_filename)
 
-    if not os.path.exists(output_path):
+    if not is_audio_cached(output_filename, output_path):
         # Generate audio if not cached
         try:
             _generate_audio_file(synthesize_request, output_path)
@@ -9,19 +9,68 @@ and returns optimized data structures ready for client interaction.
 """
 
 import fitz  # PyMuPDF
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Union, Callable
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+from array import array
+import bisect
+import multiprocessing
+import os
 import re
 import hashlib
-import json
+
+try:
+    from blake3 import blake3
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    BLAKE3_AVAILABLE = False
+
+# Content hash keying the PDF/OCR caches: "sha256", or "blake3" (needs the
+# blake3 package) for much faster hashing of large files. Switching it
+# starts the caches over.
+PDF_HASH_ALGORITHM = os.environ.get("OPENWEBTTS_PDF_HASH", "sha256").lower()
+if PDF_HASH_ALGORITHM == "blake3" and not BLAKE3_AVAILABLE:
+    print("⚠️ OPENWEBTTS_PDF_HASH=blake3 but blake3 is not installed; using SHA-256")
+
+
+# Bumped whenever the result layout changes, so cached results of older
+# versions are not served
+PROCESSING_VERSION = "2.2"
+
+# Text-only "dict" extraction: without TEXT_PRESERVE_IMAGES, MuPDF skips
+# decoding every image on the page into the result
+_TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+# Shared read-only defaults for the per-span .get() calls below, instead of
+# a fresh empty list for every block, line and span
+_NO_ITEMS = ()
+_NO_BBOX = (0, 0, 0, 0)
+
+# Element coordinates are rounded to 0.1pt: finer than highlighting needs
+# anyway, and it keeps MuPDF's float noise (72.02400207519531) out of the
+# JSON results and caches
+COORD_DECIMALS = 1
+
+# Pages with less text than this that carry an image are flagged as scans
+SCANNED_TEXT_THRESHOLD = 16
+
+# Pages each worker process should get at least when parallel extraction is
+# requested; shorter documents are extracted in-process since starting
+# workers would cost more than it saves
+PAGES_PER_WORKER = 16
 
 
 class PDFTextElement:
     """Represents a single word or text element with position data."""
     
+    # Long documents hold hundreds of thousands of these; slots drop the
+    # per-instance __dict__
+    __slots__ = ("text", "x0", "y0", "x1", "y1", "font", "size", "page_num", "element_id", "word_index")
+    
     def __init__(self, text: str, bbox: Tuple[float, float, float, float], 
                  font: str, size: float, page_num: int, element_id: int):
         self.text = text
-        self.x0, self.y0, self.x1, self.y1 = bbox
+        self.x0, self.y0, self.x1, self.y1 = (round(v, COORD_DECIMALS) for v in bbox)
         self.font = font
         self.size = size
         self.page_num = page_num
@@ -36,8 +85,8 @@ class PDFTextElement:
             "bbox": [self.x0, self.y0, self.x1, self.y1],
             "x": self.x0,
             "y": self.y0,
-            "width": self.x1 - self.x0,
-            "height": self.y1 - self.y0,
+            "width": round(self.x1 - self.x0, COORD_DECIMALS),
+            "height": round(self.y1 - self.y0, COORD_DECIMALS),
             "font": self.font,
             "size": self.size,
             "page": self.page_num,
@@ -54,7 +103,13 @@ class PDFPage:
         self.height = height
         self.text_elements: List[PDFTextElement] = []
         self.full_text = ""
-        self.word_map: Dict[int, List[int]] = {}  # word_index -> [element_ids]
+        # word_offsets[i] is the first word of text_elements[i] and the last
+        # entry is the word count: element i holds words
+        # word_offsets[i]..word_offsets[i + 1] - 1. Kept as int32 arrays,
+        # which also pickle compactly back from the worker processes
+        self.word_offsets = array("i", [0])
+        self.scanned = False  # Image-only page; its text needs OCR
+        self.word_count = 0
     
     def add_element(self, element: PDFTextElement):
         """Add a text element to this page."""
@@ -62,36 +117,28 @@ class PDFPage:
     
     def build_word_map(self):
         """Build mapping from word indices to text elements for highlighting."""
-        all_text = " ".join([elem.text for elem in self.text_elements])
-        self.full_text = all_text
+        self.full_text = " ".join([elem.text for elem in self.text_elements])
         
-        # Split into words and track their positions
-        words = re.findall(r'\S+', all_text)
-        current_pos = 0
+        # Elements are joined with a space, so no word spans two of them and
+        # each element simply owns the next len(text.split()) words
+        # (str.split and \S+ agree on what whitespace is)
         word_idx = 0
-        
-        for word in words:
-            # Find word position in full text
-            word_start = all_text.find(word, current_pos)
-            word_end = word_start + len(word)
-            
-            # Find which elements contain this word
-            char_pos = 0
-            for elem_idx, elem in enumerate(self.text_elements):
-                elem_start = char_pos
-                elem_end = char_pos + len(elem.text) + 1  # +1 for space
-                
-                # Check if word overlaps with this element
-                if not (word_end <= elem_start or word_start >= elem_end):
-                    if word_idx not in self.word_map:
-                        self.word_map[word_idx] = []
-                    self.word_map[word_idx].append(elem.element_id)
-                    elem.word_index = word_idx
-                
-                char_pos = elem_end
-            
-            word_idx += 1
-            current_pos = word_end
+        self.word_offsets = array("i", [0])
+        for elem in self.text_elements:
+            n_words = len(elem.text.split())
+            if n_words:
+                word_idx += n_words
+                elem.word_index = word_idx - 1
+            self.word_offsets.append(word_idx)
+        self.word_count = word_idx
+    
+    def element_for_word(self, word_idx: int) -> Optional[PDFTextElement]:
+        """Element holding a word, by its index within this page."""
+        if not 0 <= word_idx < self.word_count:
+            return None
+        # Elements without words share their offset with the next element,
+        # and bisect_right skips past them
+        return self.text_elements[bisect.bisect_right(self.word_offsets, word_idx) - 1]
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
@@ -101,88 +148,115 @@ class PDFPage:
             "height": self.height,
             "text": self.full_text,
             "elements": [elem.to_dict() for elem in self.text_elements],
-            "word_map": self.word_map
+            "word_offsets": self.word_offsets.tolist(),
+            "scanned": self.scanned
         }
 
 
 class PDFDocument:
     """Represents a complete PDF document with all pages and text data."""
     
-    def __init__(self, pdf_bytes: bytes):
+    def __init__(self, pdf_bytes: Optional[bytes] = None, pdf_path: Optional[str] = None,
+                 doc_hash: Optional[str] = None):
+        if pdf_bytes is None and pdf_path is None:
+            raise ValueError("Either pdf_bytes or pdf_path is required")
         self.pdf_bytes = pdf_bytes
-        self.doc_hash = hashlib.sha256(pdf_bytes).hexdigest()
+        self.pdf_path = pdf_path
+        self.doc_hash = doc_hash or self._compute_hash()
         self.pages: List[PDFPage] = []
         self.total_pages = 0
         self.full_text = ""
-        self.word_to_page_map: Dict[int, int] = {}  # global word index -> page number
+        self.word_count = 0
+        self.total_elements = 0
+        # Global index of each page's first word; a word's page is found by
+        # binary search instead of keeping one dict entry per word
+        self.page_word_starts = array("i")
+    
+    def _compute_hash(self) -> str:
+        """Content hash of the PDF (see new_content_hasher), read in chunks when working from a file."""
+        hasher = new_content_hasher()
+        if self.pdf_bytes is not None:
+            hasher.update(self.pdf_bytes)
+            return hasher.hexdigest()
+        with open(self.pdf_path, "rb") as f:
+            if hasattr(hashlib, "file_digest"):  # Python 3.11+
+                return hashlib.file_digest(f, lambda: hasher).hexdigest()
+            while chunk := f.read(1 << 20):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+    
+    def _open(self) -> fitz.Document:
+        """Open by path when available so MuPDF reads from disk instead of a copy."""
+        if self.pdf_path is not None:
+            return fitz.open(self.pdf_path, filetype="pdf")
+        return fitz.open(stream=self.pdf_bytes, filetype="pdf")
     
-    def process(self):
-        """Process the entire PDF and extract all text with positions."""
-        pdf_doc = fitz.open(stream=self.pdf_bytes, filetype="pdf")
+    def process(self, page_range: Optional[Tuple[int, int]] = None, workers: int = 1):
+        """
+        Process the PDF and extract all text with positions.
+        page_range limits it to pages first..last (1-indexed, inclusive).
+        workers > 1 spreads long documents over that many processes (see
+        map_page_slabs); leave it at 1 inside the web server.
+        """
+        pdf_doc = self._open()
         self.total_pages = len(pdf_doc)
+        start, stop = 0, self.total_pages
+        if page_range is not None:
+            start = min(max(page_range[0], 1) - 1, self.total_pages)
+            stop = max(min(page_range[1], self.total_pages), start)
+        workers = min(workers, (stop - start) // PAGES_PER_WORKER)
         
-        element_counter = 0
-        
-        for page_num in range(self.total_pages):
-            mupdf_page = pdf_doc.load_page(page_num)
-            page = PDFPage(
-                page_num=page_num + 1,  # 1-indexed for display
-                width=mupdf_page.rect.width,
-                height=mupdf_page.rect.height
-            )
-            
-            # Extract text with detailed position information
-            blocks = mupdf_page.get_text("dict")["blocks"]
-            
-            for block in blocks:
-                if block.get("type") == 0:  # Text block
-                    for line in block.get("lines", []):
-                        for span in line.get("spans", []):
-                            text = span.get("text", "").strip()
-                            if not text:
-                                continue
-                            
-                            bbox = span.get("bbox", [0, 0, 0, 0])
-                            font = span.get("font", "")
-                            size = span.get("size", 12)
-                            
-                            element = PDFTextElement(
-                                text=text,
-                                bbox=bbox,
-                                font=font,
-                                size=size,
-                                page_num=page_num + 1,
-                                element_id=element_counter
-                            )
-                            
-                            page.add_element(element)
-                            element_counter += 1
-            
-            # Build word mapping for this page
-            page.build_word_map()
-            self.pages.append(page)
+        if workers > 1:
+            # MuPDF documents can't be shared between threads, so each
+            # worker process opens its own and extracts a run of pages
+            pdf_doc.close()
+            self.pages = self._process_parallel(workers, start, stop)
+        else:
+            self.pages = _extract_pages(pdf_doc, start, stop)
+            pdf_doc.close()
         
         # Build full document text and global word mapping
         self._build_global_mappings()
+    
+    def _process_parallel(self, workers: int, start: int, stop: int) -> List["PDFPage"]:
+        """Extract pages [start, stop) across worker processes, numbering elements as a single pass would."""
+        source = self.pdf_path if self.pdf_path is not None else self.pdf_bytes
+        slabs = map_page_slabs(_extract_page_range, source, start, stop, workers)
         
-        pdf_doc.close()
+        pages = []
+        element_counter = 0
+        for slab_pages in slabs:
+            # Element ids restart at 0 in every slab
+            if element_counter:
+                for page in slab_pages:
+                    for elem in page.text_elements:
+                        elem.element_id += element_counter
+            element_counter += sum(len(page.text_elements) for page in slab_pages)
+            pages.extend(slab_pages)
+        return pages
     
     def _build_global_mappings(self):
         """Build global text and word-to-page mappings."""
-        all_text_parts = []
-        global_word_idx = 0
-        
-        for page in self.pages:
-            page_text = page.full_text
-            all_text_parts.append(page_text)
-            
-            # Map each word in this page to the page number
-            words = re.findall(r'\S+', page_text)
-            for _ in words:
-                self.word_to_page_map[global_word_idx] = page.page_num
-                global_word_idx += 1
-        
-        self.full_text = "\n".join(all_text_parts)
+        word_counts = [page.word_count for page in self.pages]
+        self.page_word_starts = array("i", accumulate(word_counts[:-1], initial=0)) if word_counts else array("i")
+        self.word_count = sum(word_counts)
+        self.total_elements = sum(len(page.text_elements) for page in self.pages)
+        self.full_text = "\n".join(page.full_text for page in self.pages)
+    
+    def _page_index_of_word(self, word_idx: int) -> Optional[int]:
+        """Index into self.pages of the page holding a global word index."""
+        if not 0 <= word_idx < self.word_count:
+            return None
+        return bisect.bisect_right(self.page_word_starts, word_idx) - 1
+    
+    @property
+    def word_to_page_map(self) -> Dict[int, int]:
+        """Global word index -> page number, built on request."""
+        return {
+            self.page_word_starts[i] + local_idx: page.page_num
+            for i, page in enumerate(self.pages)
+            for local_idx in range(page.word_count)
+        }
     
     def get_text_chunks(self, chunk_size: int = 50) -> List[Dict[str, Any]]:
         """
@@ -195,14 +269,16 @@ class PDFDocument:
         for i in range(0, len(words), chunk_size):
             chunk_words = words[i:i + chunk_size]
             chunk_text = " ".join(chunk_words)
+            first_page = self._page_index_of_word(i)
+            last_page = self._page_index_of_word(i + len(chunk_words) - 1)
             
             chunks.append({
                 "id": len(chunks),
                 "text": chunk_text,
                 "word_start": i,
                 "word_end": i + len(chunk_words),
-                "page_start": self.word_to_page_map.get(i, 1),
-                "page_end": self.word_to_page_map.get(i + len(chunk_words) - 1, 1)
+                "page_start": self.pages[first_page].page_num if first_page is not None else 1,
+                "page_end": self.pages[last_page].page_num if last_page is not None else 1
             })
         
         return chunks
@@ -215,25 +291,20 @@ class PDFDocument:
         highlight_data = {}
         
         for word_idx in range(word_start, word_end):
-            page_num = self.word_to_page_map.get(word_idx)
-            if not page_num:
-                continue
-            
-            # Find the page
-            page = next((p for p in self.pages if p.page_num == page_num), None)
-            if not page:
+            page_idx = self._page_index_of_word(word_idx)
+            if page_idx is None:
                 continue
+            page = self.pages[page_idx]
+            page_num = page.page_num
             
-            # Get elements for this word
-            element_ids = page.word_map.get(word_idx - sum(len(re.findall(r'\S+', p.full_text)) for p in self.pages if p.page_num < page_num), [])
+            # Get the element for this word
+            elem = page.element_for_word(word_idx - self.page_word_starts[page_idx])
             
             if page_num not in highlight_data:
                 highlight_data[page_num] = []
             
-            for elem_id in element_ids:
-                elem = next((e for e in page.text_elements if e.element_id == elem_id), None)
-                if elem:
-                    highlight_data[page_num].append(elem.to_dict())
+            if elem:
+                highlight_data[page_num].append(elem.to_dict())
         
         return highlight_data
     
@@ -244,28 +315,199 @@ class PDFDocument:
             "total_pages": self.total_pages,
             "full_text": self.full_text,
             "pages": [page.to_dict() for page in self.pages],
-            "word_count": len(re.findall(r'\S+', self.full_text)),
+            "word_count": self.word_count,
             "word_to_page": self.word_to_page_map
         }
 
 
-def process_pdf_for_interactive_reading(pdf_bytes: bytes, options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+def new_content_hasher():
+    """Hash object for PDF content keys, per OPENWEBTTS_PDF_HASH."""
+    if PDF_HASH_ALGORITHM == "blake3" and BLAKE3_AVAILABLE:
+        return blake3(max_threads=blake3.AUTO)
+    return hashlib.sha256()
+
+
+def map_page_slabs(fn: Callable[[Union[str, bytes], int, int], list], source: Union[str, bytes],
+                   start: int, stop: int, workers: int) -> List[list]:
+    """
+    Run fn(source, slab_start, slab_stop) over pages [start, stop) split into
+    slabs across worker processes, returning the results in page order.
+    
+    MuPDF documents can't be shared between threads, so each worker opens its
+    own. Workers are spawned rather than forked, as forking a process with
+    running threads can deadlock; a spawned worker re-imports the __main__
+    module though, so this is meant for scripts and tools, not the web
+    server, which imports whisper/torch at startup.
+    """
+    # A few slabs per worker evens out pages that take longer than others
+    slab = -(-(stop - start) // (workers * 4))
+    starts = list(range(start, stop, slab))
+    stops = [min(slab_start + slab, stop) for slab_start in starts]
+    
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return list(pool.map(fn, [source] * len(starts), starts, stops))
+
+
+def _extract_pages(pdf_doc: fitz.Document, start: int, stop: int) -> List[PDFPage]:
+    """Extract pages [start, stop) with positioned text; element ids count from 0."""
+    pages = []
+    element_counter = 0
+    # A document uses a handful of fonts and sizes; share one object per
+    # distinct value instead of a fresh one per span
+    fonts: Dict[str, str] = {}
+    sizes: Dict[float, float] = {}
+    
+    for page_num in range(start, stop):
+        mupdf_page = pdf_doc.load_page(page_num)
+        page = PDFPage(
+            page_num=page_num + 1,  # 1-indexed for display
+            width=mupdf_page.rect.width,
+            height=mupdf_page.rect.height
+        )
+        
+        # Extract text with detailed position information
+        blocks = mupdf_page.get_text("dict", flags=_TEXT_FLAGS)["blocks"]
+        
+        for block in blocks:
+            if block.get("type") == 0:  # Text block
+                for line in block.get("lines", _NO_ITEMS):
+                    for span in line.get("spans", _NO_ITEMS):
+                        text = span.get("text", "").strip()
+                        if not text:
+                            continue
+                        
+                        bbox = span.get("bbox", _NO_BBOX)
+                        font = span.get("font", "")
+                        font = fonts.setdefault(font, font)
+                        size = span.get("size", 12)
+                        size = sizes.setdefault(size, size)
+                        
+                        element = PDFTextElement(
+                            text=text,
+                            bbox=bbox,
+                            font=font,
+                            size=size,
+                            page_num=page_num + 1,
+                            element_id=element_counter
+                        )
+                        
+                        page.add_element(element)
+                        element_counter += 1
+        
+        # Build word mapping for this page
+        page.build_word_map()
+        
+        # Text extraction above skips images, so a scanned page costs next
+        # to nothing; just flag it for OCR. Listing images doesn't decode them.
+        page.scanned = len(page.full_text) < SCANNED_TEXT_THRESHOLD and bool(mupdf_page.get_images())
+        pages.append(page)
+    
+    return pages
+
+
+def _extract_page_range(source: Union[str, bytes], start: int, stop: int) -> List[PDFPage]:
+    """Worker-process entry point: open the PDF from a path or bytes and extract a run of pages."""
+    if isinstance(source, str):
+        pdf_doc = fitz.open(source, filetype="pdf")
+    else:
+        pdf_doc = fitz.open(stream=source, filetype="pdf")
+    try:
+        return _extract_pages(pdf_doc, start, stop)
+    finally:
+        pdf_doc.close()
+
+
+def extract_page_text_positions(page, page_num: int) -> Dict[str, Any]:
+    """Extract the positioned text spans of a single PyMuPDF page."""
+    page_dict = {
+        "page_number": page_num + 1,  # 1-based page numbering
+        "width": page.rect.width,
+        "height": page.rect.height,
+        "text_items": []
+    }
+    
+    # Extract text with detailed position information using "dict" method
+    # This provides the most complete text extraction
+    try:
+        blocks = page.get_text("dict", flags=_TEXT_FLAGS)["blocks"]
+        append_item = page_dict["text_items"].append
+        
+        for block in blocks:
+            if block.get("type") == 0:  # Text block
+                for line in block.get("lines", _NO_ITEMS):
+                    for span in line.get("spans", _NO_ITEMS):
+                        text = span["text"]
+                        # Only add non-empty text
+                        if not text.strip():
+                            continue
+                        x0, y0, x1, y1 = span["bbox"]
+                        append_item({
+                            "text": text,
+                            "x": x0,  # left
+                            "y": y0,  # top
+                            "width": x1 - x0,
+                            "height": y1 - y0,
+                            "font": span.get("font", "sans-serif"),
+                            "size": span.get("size", 12),
+                            "color": span.get("color", 0)
+                        })
+    except Exception as e:
+        print(f"Error extracting text from page {page_num + 1}: {e}")
+        # Fallback to simpler text extraction
+        try:
+            text_content = page.get_text("text")
+            if text_content.strip():
+                # Create a single text item for the whole page as fallback
+                rect = page.rect
+                page_dict["text_items"].append({
+                    "text": text_content,
+                    "x": rect.x0,
+                    "y": rect.y0,
+                    "width": rect.width,
+                    "height": rect.height,
+                    "font": "sans-serif",
+                    "size": 12,
+                    "color": 0
+                })
+        except Exception as fallback_error:
+            print(f"Fallback text extraction also failed for page {page_num + 1}: {fallback_error}")
+    
+    print(f"✅ Page {page_num + 1}: Extracted {len(page_dict['text_items'])} text items")
+    return page_dict
+
+
+def extract_page_range_text_positions(pdf_path: str, start: int, stop: int) -> List[Dict[str, Any]]:
+    """Worker for map_page_slabs, for scripts extracting text positions in parallel: opens its own Document for pages [start, stop)."""
+    with fitz.open(pdf_path) as doc:
+        return [extract_page_text_positions(doc[page_num], page_num) for page_num in range(start, stop)]
+
+
+def process_pdf_for_interactive_reading(pdf_bytes: Optional[bytes] = None, options: Optional[Dict[str, Any]] = None,
+                                        pdf_path: Optional[str] = None, doc_hash: Optional[str] = None,
+                                        page_range: Optional[Tuple[int, int]] = None) -> Dict[str, Any]:
     """
     Main entry point for PDF processing.
     
     Args:
         pdf_bytes: Raw PDF file bytes
-        options: Optional processing options (e.g., chunk_size, skip_headers)
+        options: Optional processing options (e.g., chunk_size, skip_headers,
+            workers for multi-process extraction; see PDFDocument.process)
+        pdf_path: Path to the PDF on disk, used instead of pdf_bytes
+        doc_hash: Precomputed content hash of the PDF, skips re-hashing
+        page_range: Only process pages first..last (1-indexed, inclusive), e.g.
+            the ones on screen first; text, words and chunks then cover just
+            those pages, while total_pages is still the whole document's
     
     Returns:
         Complete structured data ready for client-side rendering and interaction
     """
     options = options or {}
     chunk_size = options.get("chunk_size", 50)
+    workers = options.get("workers", 1)
     
     # Create and process document
-    doc = PDFDocument(pdf_bytes)
-    doc.process()
+    doc = PDFDocument(pdf_bytes, pdf_path=pdf_path, doc_hash=doc_hash)
+    doc.process(page_range=page_range, workers=workers)
     
     # Get reading chunks
     chunks = doc.get_text_chunks(chunk_size=chunk_size)
@@ -276,15 +518,17 @@ def process_pdf_for_interactive_reading(pdf_bytes: bytes, options: Optional[Dict
         "document": {
             "hash": doc.doc_hash,
             "total_pages": doc.total_pages,
-            "word_count": len(re.findall(r'\S+', doc.full_text)),
+            "word_count": doc.word_count,
             "full_text": doc.full_text
         },
         "pages": [page.to_dict() for page in doc.pages],
         "chunks": chunks,
         "metadata": {
-            "processing_version": "1.0",
+            "processing_version": PROCESSING_VERSION,
             "chunk_size": chunk_size,
-            "total_chunks": len(chunks)
+            "total_chunks": len(chunks),
+            "total_elements": doc.total_elements,
+            "page_range": [doc.pages[0].page_num, doc.pages[-1].page_num] if doc.pages else None
         }
     }
     
@@ -1,17 +1,31 @@
 import os
-import base64
+import sys
+import re
+import json
+import time
+import wave
+import asyncio
 import hashlib
 import shutil
 import tempfile
-from io import BytesIO
-from typing import List, Dict, Optional, Any
+import threading
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Any, Callable, Tuple
 import ebooklib
 import fitz
 import docx
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import whisper
+
+# Tesseract's internal OpenMP threading oversubscribes multi-core hosts and is
+# slower than running single-threaded. The tesseract subprocess inherits this.
+# Set after whisper so torch's own OpenMP pool is already initialized.
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
 import pytesseract
-from pdf2image import convert_from_bytes
+from pdf2image import convert_from_path
 from PIL import Image
 
 # Configure tesseract path for Windows
@@ -30,10 +44,18 @@ if platform.system() == 'Windows':
     else:
         print("⚠️ Tesseract not found in standard paths. OCR may fail.")
 
-from bs4 import BeautifulSoup
 from ebooklib import epub
 from fastapi import (APIRouter, BackgroundTasks, File, Form, HTTPException, Request, UploadFile)
-from fastapi.responses import HTMLResponse, JSONResponse, FileResponse, Response
+from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
+try:
+    # orjson serializes the large text-position payloads several times faster.
+    # ORJSONResponse itself always imports, so probe for orjson explicitly.
+    import orjson
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+    ORJSON_AVAILABLE = True
+except ImportError:
+    FastJSONResponse = JSONResponse
+    ORJSON_AVAILABLE = False
 from pydantic import BaseModel, Field
 from langdetect import detect
 
@@ -44,6 +66,7 @@ from config import templates, AUDIO_DIR, AUDIO_CACHE_DIR, COQUI_DIR, PIPER_DIR,
 from functions.users import UserManager
 from functions.webpage import extract_readable_content
 from functions.text_processor import process_text_for_tts, split_into_sentences_semantic
+from functions.pdf_processor import new_content_hasher, extract_page_text_positions
 
 # Lazy imports for TTS engines - these will be imported only when needed
 def lazy_import_piper():
@@ -62,6 +85,10 @@ def lazy_import_kokoro():
     from functions.kokoro import kokoro_process_audio
     return kokoro_process_audio
 
+def lazy_import_kokoro_batch():
+    from functions.kokoro import kokoro_process_audio_batch
+    return kokoro_process_audio_batch
+
 def lazy_import_kitten():
     from functions.kitten import kitten_process_audio
     return kitten_process_audio
@@ -72,6 +99,18 @@ def lazy_import_chatterbox():
 
 router = APIRouter()
 
+# Shared session for Hugging Face voice listings and downloads, so the
+# model file and its .json config reuse one pooled HTTPS connection.
+_HTTP = requests.Session()
+_HTTP.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=Retry(total=3, backoff_factor=0.2)))
+
+# Separate session for /api/read_website so arbitrary sites get keep-alive
+# reuse without sharing the Hugging Face pool.
+_WEB_HTTP = requests.Session()
+_WEB_HTTP.headers["User-Agent"] = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+_WEB_HTTP.mount("http://", HTTPAdapter(pool_connections=8, pool_maxsize=16))
+_WEB_HTTP.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=16))
+
 # --- Pydantic Models ---
 class DetectLangRequest(BaseModel):
     text: str
@@ -141,6 +180,21 @@ def check_model_directories():
     
     return False
 
+# Filenames known to exist in AUDIO_CACHE_DIR. Lets cache hits skip the
+# stat() call; misses still fall back to the filesystem.
+_CACHED_AUDIO = set()
+if os.path.isdir(AUDIO_CACHE_DIR):
+    with os.scandir(AUDIO_CACHE_DIR) as entries:
+        _CACHED_AUDIO.update(entry.name for entry in entries if entry.is_file())
+
+def is_audio_cached(output_filename: str, output_path: str) -> bool:
+    if output_filename in _CACHED_AUDIO:
+        return True
+    if os.path.exists(output_path):
+        _CACHED_AUDIO.add(output_filename)
+        return True
+    return False
+
 # --- Voice Listing ---
 
 # Coqui doesn't need model files, but we do list .wavs
@@ -235,67 +289,109 @@ def get_gemini_voices(api_key: str) -> List[Voice]:
 # --- Speech Generation ---
 # -------------------------
 
-def _generate_audio_file(request: SynthesizeRequest, output_path: str):
-    try:
-        # ---
-        # Process audio with Piper
-        # ---
-        if request.engine == "piper":
-            model_path = os.path.join(PIPER_DIR, f"{request.voice}.onnx")
-            piper_process_audio = lazy_import_piper()
-            piper_process_audio(model_path, request.lang, request.text, output_path)
-        # ---
-        # Process audio with Coqui
-        # ---
-        elif request.engine == 'coqui':
-            voice_path = os.path.join(COQUI_DIR, f"{request.voice}.wav")
-            coqui_process_audio, _ = lazy_import_coqui()
-            coqui_process_audio(voice_path, request.lang, request.text, output_path)
-        elif request.engine == 'chatterbox':
-            voice_path = os.path.join(COQUI_DIR, f"{request.voice}.wav")
-            chatterbox_process_audio = lazy_import_chatterbox()
-            chatterbox_process_audio(voice_path, request.lang, request.text, output_path)
-        # ---
-        # Process audio with Kokoro
-        # ---
-        elif request.engine == "kokoro":
-            kokoro_process_audio = lazy_import_kokoro()
-            kokoro_process_audio(request.voice, False, request.text, output_path)
-        # ---
-        # Process audio with Google Cloud TTS
-        # ---
-        elif request.engine == "gemini":
-            use_env_var = "GOOGLE_APPLICATION_CREDENTIALS" in os.environ
-
-            gemini_process_audio, _ = lazy_import_gemini()
-            if os.path.exists(request.api_key):
-                print(f"Found '{request.api_key}', using it for authentication.")
-                gemini_process_audio(text=request.text, voice=request.voice, output_filename=output_path, credentials_json_path=request.api_key)
-            elif use_env_var:
-                print("Found GOOGLE_APPLICATION_CREDENTIALS environment variable, using it for authentication.")
-                # No need to pass the path, the function will find it automatically
-                gemini_process_audio(text=request.text, voice=request.voice, output_filename=output_path)
-            else:
-                print("-" * 80)
-                print("WARNING: Could not find credentials.")
-                print("This script requires authentication to work.")
-                print("\nPlease do one of the following:")
-                print(f"1. Place your service account JSON key in this directory and name it '{local_credentials_file}'")
-                print("OR")
-                print("2. Set the GOOGLE_APPLICATION_CREDENTIALS environment variable.")
-                print("\nSee the README.md file for detailed instructions.")
-                print("-" * 80)
-        # ---
-        # Process audio with Kitten
-        # ---
-        elif request.engine == "kitten":
-            kitten_process_audio = lazy_import_kitten()
-            kitten_process_audio(request.voice, False, request.text, output_path)
-        # ---
-        # Or fail.
-        # ---
+# Each builder imports its engine once and returns a handler that takes
+# (request, output_path). Handlers are built on first use and cached in
+# _ENGINE_HANDLERS so later requests are a single dict lookup.
+
+# ---
+# Process audio with Piper
+# ---
+def _build_piper_handler():
+    piper_process_audio = lazy_import_piper()
+    def handler(request: SynthesizeRequest, output_path: str):
+        model_path = os.path.join(PIPER_DIR, f"{request.voice}.onnx")
+        piper_process_audio(model_path, request.lang, request.text, output_path)
+    return handler
+
+# ---
+# Process audio with Coqui
+# ---
+def _build_coqui_handler():
+    coqui_process_audio, _ = lazy_import_coqui()
+    def handler(request: SynthesizeRequest, output_path: str):
+        voice_path = os.path.join(COQUI_DIR, f"{request.voice}.wav")
+        coqui_process_audio(voice_path, request.lang, request.text, output_path)
+    return handler
+
+def _build_chatterbox_handler():
+    chatterbox_process_audio = lazy_import_chatterbox()
+    def handler(request: SynthesizeRequest, output_path: str):
+        voice_path = os.path.join(COQUI_DIR, f"{request.voice}.wav")
+        chatterbox_process_audio(voice_path, request.lang, request.text, output_path)
+    return handler
+
+# ---
+# Process audio with Kokoro
+# ---
+def _build_kokoro_handler():
+    kokoro_process_audio = lazy_import_kokoro()
+    def handler(request: SynthesizeRequest, output_path: str):
+        kokoro_process_audio(request.voice, False, request.text, output_path)
+    return handler
+
+# ---
+# Process audio with Google Cloud TTS
+# ---
+def _build_gemini_handler():
+    gemini_process_audio, _ = lazy_import_gemini()
+    def handler(request: SynthesizeRequest, output_path: str):
+        use_env_var = "GOOGLE_APPLICATION_CREDENTIALS" in os.environ
+
+        if os.path.exists(request.api_key):
+            print(f"Found '{request.api_key}', using it for authentication.")
+            gemini_process_audio(text=request.text, voice=request.voice, output_filename=output_path, credentials_json_path=request.api_key)
+        elif use_env_var:
+            print("Found GOOGLE_APPLICATION_CREDENTIALS environment variable, using it for authentication.")
+            # No need to pass the path, the function will find it automatically
+            gemini_process_audio(text=request.text, voice=request.voice, output_filename=output_path)
         else:
+            print("-" * 80)
+            print("WARNING: Could not find credentials.")
+            print("This script requires authentication to work.")
+            print("\nPlease do one of the following:")
+            print(f"1. Place your service account JSON key in this directory and name it '{local_credentials_file}'")
+            print("OR")
+            print("2. Set the GOOGLE_APPLICATION_CREDENTIALS environment variable.")
+            print("\nSee the README.md file for detailed instructions.")
+            print("-" * 80)
+    return handler
+
+# ---
+# Process audio with Kitten
+# ---
+def _build_kitten_handler():
+    kitten_process_audio = lazy_import_kitten()
+    def handler(request: SynthesizeRequest, output_path: str):
+        kitten_process_audio(request.voice, False, request.text, output_path)
+    return handler
+
+_ENGINE_BUILDERS: Dict[str, Callable[[], Callable[[SynthesizeRequest, str], None]]] = {
+    "piper": _build_piper_handler,
+    "coqui": _build_coqui_handler,
+    "chatterbox": _build_chatterbox_handler,
+    "kokoro": _build_kokoro_handler,
+    "gemini": _build_gemini_handler,
+    "kitten": _build_kitten_handler,
+}
+_ENGINE_HANDLERS: Dict[str, Callable[[SynthesizeRequest, str], None]] = {}
+
+def _get_engine(name: str) -> Callable[[SynthesizeRequest, str], None]:
+    handler = _ENGINE_HANDLERS.get(name)
+    if handler is None:
+        builder = _ENGINE_BUILDERS.get(name)
+        # Or fail.
+        if builder is None:
             raise ValueError("Unsupported TTS engine.")
+        handler = _ENGINE_HANDLERS[name] = builder()
+    return handler
+
+def _generate_audio_file(request: SynthesizeRequest, output_path: str):
+    try:
+        handler = _get_engine(request.engine)
+        handler(request, output_path)
+
+        if os.path.exists(output_path):
+            _CACHED_AUDIO.add(os.path.basename(output_path))
     except Exception as e:
         print(f"Error generating audio for engine {request.engine}: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to generate audio. Reason: {str(e)}")
@@ -329,6 +425,18 @@ async def health_check():
         "version": "1.0.0"
     })
 
+# CORS headers for the browser extension endpoints. Built once; responses
+# only read from these dicts.
+_CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "POST, OPTIONS",
+    "Access-Control-Allow-Headers": "Content-Type, Authorization",
+}
+_CORS_HEADERS_PNA = {**_CORS_HEADERS, "Access-Control-Allow-Private-Network": "true"}
+_CORS_PREFLIGHT_HEADERS = {**_CORS_HEADERS, "Access-Control-Max-Age": "3600"}
+_CORS_PREFLIGHT_HEADERS_PNA = {**_CORS_PREFLIGHT_HEADERS, "Access-Control-Allow-Private-Network": "true"}
+_AUDIO_FILE_HEADERS = {"Cache-Control": "public, max-age=31536000", **_CORS_HEADERS_PNA}
+
 class GenerateSpeechRequest(BaseModel):
     text: str = Field(..., description="Text to convert to speech")
     voice: Optional[str] = Field("piper", description="TTS engine/voice to use")
@@ -349,6 +457,9 @@ class ChunkTiming(BaseModel):
     endOffset: int
     words: List[WordTiming]
 
+# Pattern to detect skip regions: citation markers like [1], [2][3], etc.
+SKIP_PATTERN = re.compile(r'\[\d+\](?:\[\d+\])*')
+
 class SpeechTimingResponse(BaseModel):
     audioUrl: str
     duration: float
@@ -356,39 +467,40 @@ class SpeechTimingResponse(BaseModel):
     originalText: str
     normalizedText: str
 
+_SPACE_BEFORE_PUNCT_RE = re.compile(r'\s+([.,!?;:])')
+_WORD_RE = re.compile(r'\S+')
+
+def normalize_text_with_spans(text: str) -> Tuple[str, List[Tuple[int, int]]]:
+    """
+    Collapse whitespace, drop spaces before punctuation, and return the
+    normalized text with the (start, end) offset of every word in it.
+    Words in the result are separated by exactly one space.
+    """
+    normalized_text = _SPACE_BEFORE_PUNCT_RE.sub(r'\1', ' '.join(text.split()))
+    word_spans = [m.span() for m in _WORD_RE.finditer(normalized_text)]
+    return normalized_text, word_spans
+
 def calculate_word_timings(text: str, duration: float, chunk_size: int = 50) -> List[ChunkTiming]:
     """
     Calculate precise timing for words and chunks based on text and audio duration.
     Uses character-based distribution for more accurate timing.
     """
-    import re
-    
-    # Normalize text: remove extra whitespace, normalize punctuation
-    normalized_text = ' '.join(text.split())
-    normalized_text = re.sub(r'\s+([.,!?;:])', r'\1', normalized_text)
-    
-    # Split into words while preserving positions
-    words_with_pos = []
-    for match in re.finditer(r'\S+', normalized_text):
-        words_with_pos.append({
-            'word': match.group(),
-            'start': match.start(),
-            'end': match.end()
-        })
+    # Normalize text and split into words while preserving positions
+    normalized_text, word_spans = normalize_text_with_spans(text)
     
-    if not words_with_pos:
+    if not word_spans:
         return []
     
     total_chars = len(normalized_text)
     chunks = []
     
     # Split words into chunks
-    for chunk_idx in range(0, len(words_with_pos), chunk_size):
-        chunk_words = words_with_pos[chunk_idx:chunk_idx + chunk_size]
+    for chunk_idx in range(0, len(word_spans), chunk_size):
+        chunk_words = word_spans[chunk_idx:chunk_idx + chunk_size]
         
         # Calculate chunk boundaries
-        chunk_start_offset = chunk_words[0]['start']
-        chunk_end_offset = chunk_words[-1]['end']
+        chunk_start_offset = chunk_words[0][0]
+        chunk_end_offset = chunk_words[-1][1]
         chunk_text = normalized_text[chunk_start_offset:chunk_end_offset]
         
         # Calculate chunk timing based on character position
@@ -397,12 +509,12 @@ def calculate_word_timings(text: str, duration: float, chunk_size: int = 50) ->
         
         # Calculate word timings within chunk
         word_timings = []
-        for word_idx, word_data in enumerate(chunk_words):
-            word_start_time = (word_data['start'] / total_chars) * duration
-            word_end_time = (word_data['end'] / total_chars) * duration
+        for word_idx, (word_start, word_end) in enumerate(chunk_words):
+            word_start_time = (word_start / total_chars) * duration
+            word_end_time = (word_end / total_chars) * duration
             
             word_timings.append(WordTiming(
-                word=word_data['word'],
+                word=normalized_text[word_start:word_end],
                 startTime=round(word_start_time, 3),
                 endTime=round(word_end_time, 3),
                 index=word_idx
@@ -435,7 +547,7 @@ async def generate_speech(request: GenerateSpeechRequest):
     output_path = os.path.join(AUDIO_CACHE_DIR, output_filename)
     
     # Check if audio already exists in cache
-    if not os.path.exists(output_path):
+    if not is_audio_cached(output_filename, output_path):
         # Generate audio based on engine/voice
         try:
             engine = request.voice.lower()
@@ -471,22 +583,16 @@ async def generate_speech(request: GenerateSpeechRequest):
             print(f"❌ Error generating speech: {e}")
             raise HTTPException(status_code=500, detail=f"Speech generation failed: {str(e)}")
     
-    # Return audio file
-    if not os.path.exists(output_path):
-        raise HTTPException(status_code=500, detail="Audio generation failed")
+        if not os.path.exists(output_path):
+            raise HTTPException(status_code=500, detail="Audio generation failed")
+        _CACHED_AUDIO.add(output_filename)
     
     # For backward compatibility, return file directly
     return FileResponse(
         output_path,
         media_type="audio/wav",
-        headers={
-            "Content-Disposition": f"attachment; filename={output_filename}",
-            "Cache-Control": "public, max-age=31536000",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "POST, OPTIONS",
-            "Access-Control-Allow-Headers": "Content-Type, Authorization",
-            "Access-Control-Allow-Private-Network": "true"
-        }
+        filename=output_filename,
+        headers=_AUDIO_FILE_HEADERS
     )
 
 @router.post("/api/generate_speech_with_timing")
@@ -499,30 +605,25 @@ async def generate_speech_with_timing(request: GenerateSpeechRequest):
     if not request.text.strip():
         raise HTTPException(status_code=400, detail="Text cannot be empty.")
     
-    import re
-    
     # Normalize text
-    normalized_text = ' '.join(request.text.split())
-    normalized_text = re.sub(r'\s+([.,!?;:])', r'\1', normalized_text)
+    normalized_text, word_spans = normalize_text_with_spans(request.text)
     
-    # Pattern to detect skip regions: citation markers like [1], [2][3], etc.
-    skip_pattern = re.compile(r'\[\d+\](?:\[\d+\])*')
+    # Find all skip regions in one pass, keyed by start offset -> end offset.
+    # A word is a skip region when a match spans it exactly.
+    skip_ends = {m.start(): m.end() for m in SKIP_PATTERN.finditer(normalized_text)}
     
     # Split into chunks based on chunk size
-    words = normalized_text.split()
     chunk_size = request.chunkSize or 50
     
     chunks_data = []
-    current_pos = 0
     
-    for chunk_idx in range(0, len(words), chunk_size):
-        chunk_words = words[chunk_idx:chunk_idx + chunk_size]
-        chunk_text = ' '.join(chunk_words)
+    for chunk_idx in range(0, len(word_spans), chunk_size):
+        chunk_words = word_spans[chunk_idx:chunk_idx + chunk_size]
         
         # Calculate character offsets
-        start_offset = normalized_text.find(chunk_text, current_pos)
-        end_offset = start_offset + len(chunk_text)
-        current_pos = end_offset
+        start_offset = chunk_words[0][0]
+        end_offset = chunk_words[-1][1]
+        chunk_text = normalized_text[start_offset:end_offset]
         
         # Create hash for this chunk
         hash_input = f"{chunk_text}-{request.voice}-{request.speed}"
@@ -531,7 +632,7 @@ async def generate_speech_with_timing(request: GenerateSpeechRequest):
         output_path = os.path.join(AUDIO_CACHE_DIR, output_filename)
         
         # Generate audio if not cached (includes citation markers for TTS)
-        if not os.path.exists(output_path):
+        if not is_audio_cached(output_filename, output_path):
             try:
                 engine = request.voice.lower()
                 
@@ -558,11 +659,11 @@ async def generate_speech_with_timing(request: GenerateSpeechRequest):
                 print(f"❌ Error generating speech for chunk {chunk_idx}: {e}")
                 raise HTTPException(status_code=500, detail=f"Speech generation failed: {str(e)}")
         
-        if not os.path.exists(output_path):
-            raise HTTPException(status_code=500, detail=f"Audio generation failed for chunk {chunk_idx}")
+            if not os.path.exists(output_path):
+                raise HTTPException(status_code=500, detail=f"Audio generation failed for chunk {chunk_idx}")
+            _CACHED_AUDIO.add(output_filename)
         
         # Get audio duration for this chunk
-        import wave
         try:
             with wave.open(output_path, 'rb') as wav_file:
                 frames = wav_file.getnframes()
@@ -576,20 +677,18 @@ async def generate_speech_with_timing(request: GenerateSpeechRequest):
         word_timings = []
         chunk_char_count = len(chunk_text)
         
-        for word_idx, word in enumerate(chunk_words):
-            # Find word position in chunk text
-            word_search_start = sum(len(chunk_words[i]) + 1 for i in range(word_idx))
-            word_start_pos = chunk_text.find(word, word_search_start)
-            if word_start_pos == -1:
-                word_start_pos = word_search_start
-            word_end_pos = word_start_pos + len(word)
+        for word_idx, (word_start, word_end) in enumerate(chunk_words):
+            word = normalized_text[word_start:word_end]
+            # Word position relative to the chunk text
+            word_start_pos = word_start - start_offset
+            word_end_pos = word_end - start_offset
             
             # Calculate timing based on character position
             word_start_time = (word_start_pos / chunk_char_count) * duration if chunk_char_count > 0 else 0
             word_end_time = (word_end_pos / chunk_char_count) * duration if chunk_char_count > 0 else duration
             
             # Check if this word matches skip pattern (citation marker)
-            is_skip = bool(skip_pattern.fullmatch(word))
+            is_skip = skip_ends.get(word_start) == word_end
             
             word_timings.append({
                 'word': word,
@@ -618,74 +717,173 @@ async def generate_speech_with_timing(request: GenerateSpeechRequest):
             'originalText': request.text,
             'normalizedText': normalized_text
         },
-        headers={
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "POST, OPTIONS",
-            "Access-Control-Allow-Headers": "Content-Type, Authorization",
-            "Access-Control-Allow-Private-Network": "true"
-        }
+        headers=_CORS_HEADERS_PNA
     )
 
+class GenerateSpeechBatchRequest(BaseModel):
+    texts: List[str] = Field(..., description="Short utterances to convert to speech")
+    voice: Optional[str] = Field("piper", description="TTS engine/voice to use")
+    speed: Optional[float] = Field(1.0, description="Playback speed multiplier")
+
+def _synthesize_speech_batch(engine: str, items: List[Tuple[str, str]]):
+    """Synthesize each (text, output_path) pair with the given engine."""
+    if engine == "kokoro":
+        kokoro_process_audio_batch = lazy_import_kokoro_batch()
+        kokoro_process_audio_batch("am_liam", "a", items)
+    elif engine == "coqui":
+        coqui_process_audio, _ = lazy_import_coqui()
+        voice_path = os.path.join(COQUI_DIR, "default.wav")
+        if not os.path.exists(voice_path):
+            raise HTTPException(status_code=400, detail="Coqui requires a voice sample. Please upload one first.")
+        for text, output_path in items:
+            coqui_process_audio(voice_path, "en", text, output_path)
+    elif engine == "openai":
+        raise HTTPException(status_code=400, detail="OpenAI TTS requires API key configuration")
+    else:
+        # Piper, also the default
+        piper_process_audio = lazy_import_piper()
+        model_path = os.path.join(PIPER_DIR, "en_US-lessac-high.onnx")
+        for text, output_path in items:
+            piper_process_audio(model_path, "en_US", text, output_path)
+
+@router.post("/api/generate_speech_batch")
+async def generate_speech_batch(request: GenerateSpeechBatchRequest):
+    """
+    Generate speech for many short utterances (e.g. screen reader labels) at once.
+    Each utterance is cached under the same key as /api/generate_speech, so
+    repeated utterances skip synthesis. Kokoro loads its pipeline once per batch.
+    Returns one audio URL per input text (null for empty texts).
+    """
+    if not any(text.strip() for text in request.texts):
+        raise HTTPException(status_code=400, detail="Texts cannot be empty.")
+    
+    audio_urls = []
+    pending = {}  # output_filename -> (text, output_path)
+    
+    for text in request.texts:
+        if not text.strip():
+            audio_urls.append(None)
+            continue
+        hash_input = f"{text}-{request.voice}-{request.speed}"
+        unique_hash = hashlib.sha256(hash_input.encode('utf-8')).hexdigest()
+        output_filename = f"{unique_hash}.wav"
+        output_path = os.path.join(AUDIO_CACHE_DIR, output_filename)
+        audio_urls.append(f"/audio_cache/{output_filename}")
+        
+        if output_filename not in pending and not is_audio_cached(output_filename, output_path):
+            pending[output_filename] = (text, output_path)
+    
+    if pending:
+        try:
+            # Synthesis blocks for the whole batch; keep it off the event loop
+            await asyncio.to_thread(_synthesize_speech_batch, request.voice.lower(), list(pending.values()))
+        except HTTPException:
+            raise
+        except Exception as e:
+            print(f"❌ Error generating speech batch: {e}")
+            raise HTTPException(status_code=500, detail=f"Speech generation failed: {str(e)}")
+        
+        for output_filename, (_, output_path) in pending.items():
+            if not os.path.exists(output_path):
+                raise HTTPException(status_code=500, detail="Audio generation failed")
+            _CACHED_AUDIO.add(output_filename)
+    
+    return JSONResponse(content={"audioUrls": audio_urls}, headers=_CORS_HEADERS_PNA)
+
 @router.options("/api/generate_speech")
 async def generate_speech_options(request: Request):
     """Handle CORS preflight request for browser extension."""
-    # Check if Private Network Access is requested
-    access_pna = request.headers.get("Access-Control-Request-Private-Network") == "true"
-    
-    headers = {
-        "Access-Control-Allow-Origin": "*",
-        "Access-Control-Allow-Methods": "POST, OPTIONS",
-        "Access-Control-Allow-Headers": "Content-Type, Authorization",
-        "Access-Control-Max-Age": "3600"
-    }
-    
     # Add Private Network Access header if requested
-    if access_pna:
-        headers["Access-Control-Allow-Private-Network"] = "true"
-    
+    access_pna = request.headers.get("Access-Control-Request-Private-Network") == "true"
+    headers = _CORS_PREFLIGHT_HEADERS_PNA if access_pna else _CORS_PREFLIGHT_HEADERS
     return JSONResponse(content={}, headers=headers)
 
 @router.options("/api/generate_speech_with_timing")
 async def generate_speech_with_timing_options(request: Request):
     """Handle CORS preflight request for timing-based endpoint."""
     access_pna = request.headers.get("Access-Control-Request-Private-Network") == "true"
-    
-    headers = {
-        "Access-Control-Allow-Origin": "*",
-        "Access-Control-Allow-Methods": "POST, OPTIONS",
-        "Access-Control-Allow-Headers": "Content-Type, Authorization",
-        "Access-Control-Max-Age": "3600"
-    }
-    
-    if access_pna:
-        headers["Access-Control-Allow-Private-Network"] = "true"
-    
+    headers = _CORS_PREFLIGHT_HEADERS_PNA if access_pna else _CORS_PREFLIGHT_HEADERS
+    return JSONResponse(content={}, headers=headers)
+
+@router.options("/api/generate_speech_batch")
+async def generate_speech_batch_options(request: Request):
+    """Handle CORS preflight request for the batch endpoint."""
+    access_pna = request.headers.get("Access-Control-Request-Private-Network") == "true"
+    headers = _CORS_PREFLIGHT_HEADERS_PNA if access_pna else _CORS_PREFLIGHT_HEADERS
     return JSONResponse(content={}, headers=headers)
 # -----------------------
 
+PIPER_VOICES_URL = "https://huggingface.co/rhasspy/piper-voices/raw/main/voices.json"
+PIPER_VOICES_TTL = 3600  # seconds
+PIPER_VOICES_CACHE_FILE = os.path.join(PIPER_DIR, "voices.json")
+
+# (fetched_at, voices) for the Hugging Face voice list
+_piper_voices_cache = None
+
+def _fetch_piper_voices():
+    """Fetch the voice list and save a copy for later runs."""
+    response = _HTTP.get(PIPER_VOICES_URL, timeout=10)
+    response.raise_for_status()
+    voices = response.json()
+    try:
+        os.makedirs(PIPER_DIR, exist_ok=True)
+        _write_atomic(PIPER_VOICES_CACHE_FILE, json.dumps(voices).encode("utf-8"))
+    except OSError as e:
+        print(f"⚠️ Could not save voices cache: {e}")
+    return voices
+
+def _load_saved_piper_voices(now: float):
+    """Return (fetched_at, voices) from the copy saved by a previous run if it is still fresh, else None."""
+    if not os.path.exists(PIPER_VOICES_CACHE_FILE):
+        return None
+    fetched_at = os.path.getmtime(PIPER_VOICES_CACHE_FILE)
+    if now - fetched_at >= PIPER_VOICES_TTL:
+        return None
+    try:
+        with open(PIPER_VOICES_CACHE_FILE, "r", encoding="utf-8") as f:
+            return fetched_at, json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Ignoring unreadable voices cache: {e}")
+        return None
+
 @router.get("/api/piper_voices")
 async def get_piper_voices_from_hf():
+    global _piper_voices_cache
+    now = time.time()
+
+    if _piper_voices_cache and now - _piper_voices_cache[0] < PIPER_VOICES_TTL:
+        return JSONResponse(content=_piper_voices_cache[1])
+
+    # Fall back to the copy saved by a previous run, if it is still fresh
+    if _piper_voices_cache is None:
+        saved = await asyncio.to_thread(_load_saved_piper_voices, now)
+        if saved is not None:
+            _piper_voices_cache = saved
+            return JSONResponse(content=saved[1])
+
     try:
-        response = requests.get("https://huggingface.co/rhasspy/piper-voices/raw/main/voices.json")
-        response.raise_for_status()
-        return JSONResponse(content=response.json())
+        # Run the blocking request and cache write off the event loop
+        voices = await asyncio.to_thread(_fetch_piper_voices)
     except requests.exceptions.RequestException as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch voices from Hugging Face: {e}")
 
+    _piper_voices_cache = (now, voices)
+    return JSONResponse(content=voices)
+
 @router.post("/api/download_piper_voice")
 async def download_piper_voice(voice: PiperVoice):    
     check_model_directories()
     try:
         voice_url = voice.URL
         url = f"{voice_url}"
-        response = requests.get(url, stream=True)
+        response = _HTTP.get(url, stream=True)
         response.raise_for_status()
         model_path = os.path.join(PIPER_DIR, f"{voice.key}.onnx")
         with open(model_path, "wb") as f:
             for chunk in response.iter_content(chunk_size=8192):
                 f.write(chunk)
         config_url = f"{voice_url}.json"
-        config_response = requests.get(config_url)
+        config_response = _HTTP.get(config_url)
         config_response.raise_for_status()
         config_path = os.path.join(PIPER_DIR, f"{voice.key}.onnx.json")
         with open(config_path, "w", encoding="utf-8") as f:
@@ -700,7 +898,7 @@ async def download_piper_voice(voice: PiperVoice):
 async def download_kokoro_voice(voice: KokoroVoice):    
     check_model_directories()
     try:
-        response = requests.get(voice.URL, stream=True)
+        response = _HTTP.get(voice.URL, stream=True)
         response.raise_for_status()
         model_path = os.path.join(KOKORO_DIR, f"{voice.key}")
         with open(model_path, "wb") as f:
@@ -759,7 +957,7 @@ async def synthesize_speech(request: SynthesizeRequest, background_tasks: Backgr
     output_filename = f"{unique_hash}.wav"
     output_path = os.path.join(AUDIO_CACHE_DIR, output_filename)
     audio_url = f"/static/audio_cache/{output_filename}"
-    if os.path.exists(output_path):
+    if is_audio_cached(output_filename, output_path):
         return JSONResponse(content={"audio_url": audio_url, "status": "ready"})
     else:
         background_tasks.add_task(_generate_audio_file, request, output_path)
@@ -768,47 +966,193 @@ async def synthesize_speech(request: SynthesizeRequest, background_tasks: Backgr
 OCR_CACHE_DIR = os.path.join(tempfile.gettempdir(), "openwebtts_ocr_cache")
 os.makedirs(OCR_CACHE_DIR, exist_ok=True)
 
-def _perform_ocr(pdf_bytes: bytes, task_id: str):
-    """Background task to perform OCR and save the result."""
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+OCR_WORKERS = os.cpu_count() or 1
+# Bump when OCR output changes (pages, options, format) to invalidate old results
+OCR_CACHE_VERSION = 2
+# Pages with less embedded text than this are treated as scanned and OCR'd
+OCR_MIN_PAGE_CHARS = 20
+# Each OCR job already fans out across OCR_WORKERS, so only a few run at once
+OCR_MAX_JOBS = max(1, OCR_WORKERS // 2)
+OCR_SEMAPHORE = threading.BoundedSemaphore(OCR_MAX_JOBS)
+# get_text("dict") flags without image extraction; we only read text blocks
+PDF_TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+async def _save_upload_to_tempfile(file: UploadFile, suffix: str = ".pdf") -> Tuple[str, str]:
+    """
+    Stream an upload to a temporary file in fixed-size chunks, hashing it on the way.
+    Avoids holding the whole upload in memory. Returns (path, content hash
+    hexdigest); the caller is responsible for removing the file.
+    """
+    hasher = new_content_hasher()
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        try:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                tmp.write(chunk)
+                hasher.update(chunk)
+        except BaseException:
+            tmp.close()
+            os.unlink(tmp.name)
+            raise
+    return tmp.name, hasher.hexdigest()
+
+def _find_poppler_path() -> Optional[str]:
+    """
+    Convert PDF to images - requires Poppler.
+    On Windows, locate poppler if installed via conda/scoop/manual; elsewhere it's on PATH.
+    """
+    if platform.system() != 'Windows':
+        return None
+    # Try common Poppler installation locations
+    possible_poppler = [
+        r'C:\Program Files\poppler\Library\bin',
+        r'C:\poppler\Library\bin',
+        os.path.expanduser('~\\scoop\\apps\\poppler\\current\\Library\\bin'),
+    ]
+    for path in possible_poppler:
+        if os.path.exists(path):
+            return path
+    return None
+
+# Resolved once at import instead of probing the disk for every OCR task
+_POPPLER_PATH = _find_poppler_path()
+
+def _ocr_result_path(task_id: str, ext: str) -> str:
+    """Cache path for an OCR result; the version suffix retires entries written by older OCR code."""
+    return os.path.join(OCR_CACHE_DIR, f"{task_id}_v{OCR_CACHE_VERSION}.{ext}")
+
+def _write_atomic(path: str, data: bytes):
+    """
+    Write via a temp file + os.replace so a crash never leaves a truncated
+    cache entry. The temp file is unique, so two threads writing the same
+    entry can't interleave or replace each other's half-written file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+def _ocr_cached_text(task_id: str):
+    """Return the cached OCR text for a PDF's content hash, or None if it hasn't been OCR'd yet."""
+    result_path = _ocr_result_path(task_id, "txt")
+    if not os.path.exists(result_path):
+        return None
+    with open(result_path, "r", encoding="utf-8") as f:
+        return f.read()
+
+def _load_cached_json(path: str):
+    """Return the parsed JSON cached at path, or None if missing or unreadable."""
+    if not os.path.exists(path):
+        return None
+    try:
+        if ORJSON_AVAILABLE:
+            with open(path, "rb") as f:
+                return orjson.loads(f.read())
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Ignoring unreadable cache file {path}: {e}")
+        return None
+
+def _save_cached_json(path: str, data):
+    """Write data to path atomically (see _write_atomic) so readers never see a partial cache entry."""
+    if ORJSON_AVAILABLE:
+        payload = orjson.dumps(data)
+    else:
+        payload = json.dumps(data).encode("utf-8")
+    try:
+        _write_atomic(path, payload)
+    except OSError as e:
+        print(f"⚠️ Could not write cache file {path}: {e}")
+
+def _perform_ocr(pdf_path: str, task_id: str, page_texts: Optional[List[str]] = None):
+    """
+    Background task to perform OCR and save the result. Removes pdf_path when done.
+    At most OCR_MAX_JOBS run at once; further uploads queue here instead of all
+    rendering and OCR'ing in parallel.
+    """
+    with OCR_SEMAPHORE:
+        # An identical upload may have finished while this one was queued
+        if _ocr_cached_text(task_id) is not None:
+            print(f"OCR for task {task_id} already cached, skipping")
+            if os.path.exists(pdf_path):
+                os.unlink(pdf_path)
+            return
+        _run_ocr(pdf_path, task_id, page_texts)
+
+def _pages_needing_ocr(page_texts: List[str]) -> List[int]:
+    """Indexes of pages whose embedded text is too short to be the real content."""
+    return [i for i, text in enumerate(page_texts) if len(text.strip()) < OCR_MIN_PAGE_CHARS]
+
+def _contiguous_runs(page_indexes: List[int]) -> List[Tuple[int, int]]:
+    """Group sorted page indexes into inclusive (first, last) runs."""
+    runs = []
+    for i in page_indexes:
+        if runs and runs[-1][1] == i - 1:
+            runs[-1] = (runs[-1][0], i)
+        else:
+            runs.append((i, i))
+    return runs
+
+def _run_ocr(pdf_path: str, task_id: str, page_texts: Optional[List[str]] = None):
+    """
+    OCR the PDF at pdf_path. When page_texts (the embedded text of each page)
+    is given, only pages without real text are rendered and OCR'd; the other
+    pages keep their embedded text so the result still covers the whole document.
+    """
     try:
-        # Convert PDF to images - requires Poppler
-        # On Windows, specify poppler path if installed via conda/scoop/manual
-        poppler_path = None
-        if platform.system() == 'Windows':
-            # Try common Poppler installation locations
-            possible_poppler = [
-                r'C:\Program Files\poppler\Library\bin',
-                r'C:\poppler\Library\bin',
-                os.path.expanduser('~\\scoop\\apps\\poppler\\current\\Library\\bin'),
-            ]
-            for path in possible_poppler:
-                if os.path.exists(path):
-                    poppler_path = path
-                    break
+        ocr_parts = []
         
-        images = convert_from_bytes(pdf_bytes, poppler_path=poppler_path)
-        ocr_text = ""
+        # Render pages to PNG files rather than holding every page image in
+        # memory; tesseract then reads each file directly.
+        with tempfile.TemporaryDirectory() as image_dir:
+            render_options = dict(
+                poppler_path=_POPPLER_PATH,
+                output_folder=image_dir,
+                paths_only=True,
+                fmt="png",
+                thread_count=OCR_WORKERS,
+            )
+            if page_texts is None:
+                page_images = list(enumerate(convert_from_path(pdf_path, **render_options)))
+                page_count = len(page_images)
+            else:
+                page_images = []
+                page_count = len(page_texts)
+                for first, last in _contiguous_runs(_pages_needing_ocr(page_texts)):
+                    image_paths = convert_from_path(pdf_path, first_page=first + 1, last_page=last + 1, **render_options)
+                    page_images.extend(zip(range(first, last + 1), image_paths))
+            
+            # Each page runs in its own tesseract process, so threads are enough
+            # to keep OCR_WORKERS of them busy at once
+            with ThreadPoolExecutor(max_workers=OCR_WORKERS) as pool:
+                futures = {page_num: pool.submit(pytesseract.image_to_string, image_path, timeout=30) for page_num, image_path in page_images}
         
-        # Process images in batches to avoid memory issues
-        for i, image in enumerate(images):
+        for i in range(page_count):
+            if i not in futures:
+                ocr_parts.append(f"\n--- Page {i+1} ---\n{page_texts[i]}")
+                continue
             try:
-                page_text = pytesseract.image_to_string(image, timeout=30)
-                ocr_text += f"\n--- Page {i+1} ---\n{page_text}"
+                page_text = futures[i].result()
+                ocr_parts.append(f"\n--- Page {i+1} ---\n{page_text}")
             except Exception as page_error:
                 print(f"Warning: Failed to OCR page {i+1}: {page_error}")
-                ocr_text += f"\n--- Page {i+1} ---\n[OCR failed for this page]\n"
+                ocr_parts.append(f"\n--- Page {i+1} ---\n[OCR failed for this page]\n")
+        ocr_text = "".join(ocr_parts)
         
-        result_path = os.path.join(OCR_CACHE_DIR, f"{task_id}.txt")
-        with open(result_path, "w", encoding="utf-8") as f:
-            f.write(ocr_text)
+        result_path = _ocr_result_path(task_id, "txt")
+        _write_atomic(result_path, ocr_text.encode("utf-8"))
         print(f"✅ OCR for task {task_id} completed. Result saved to {result_path}")
         
     except ImportError as e:
         error_msg = f"Missing dependency: {e}. Install with: pip install pdf2image pytesseract"
         print(f"❌ {error_msg}")
-        result_path = os.path.join(OCR_CACHE_DIR, f"{task_id}.error")
-        with open(result_path, "w", encoding="utf-8") as f:
-            f.write(error_msg)
+        _write_atomic(_ocr_result_path(task_id, "error"), error_msg.encode("utf-8"))
             
     except Exception as e:
         error_type = type(e).__name__
@@ -829,27 +1173,28 @@ def _perform_ocr(pdf_bytes: bytes, task_id: str):
             error_msg = f"{error_type}: {error_msg}"
         
         print(f"❌ Error during OCR for task {task_id}: {error_msg}")
-        result_path = os.path.join(OCR_CACHE_DIR, f"{task_id}.error")
-        with open(result_path, "w", encoding="utf-8") as f:
-            f.write(error_msg)
+        _write_atomic(_ocr_result_path(task_id, "error"), error_msg.encode("utf-8"))
+
+    finally:
+        if os.path.exists(pdf_path):
+            os.unlink(pdf_path)
 
 def _merge_extracted_and_ocr_text(extracted_text: str, ocr_text: str) -> str:
     """
     Intelligently merge direct text extraction with OCR results.
     Prioritizes direct extraction but adds OCR content for pages with little/no text.
     """
-    if not ocr_text or not ocr_text.strip():
+    # Measure the stripped lengths once; each strip() copies the whole text
+    ocr_len = len(ocr_text.strip()) if ocr_text else 0
+    if not ocr_len:
         return extracted_text
     
-    if not extracted_text or not extracted_text.strip():
+    extracted_len = len(extracted_text.strip()) if extracted_text else 0
+    if not extracted_len:
         return ocr_text
     
-    # Split by pages if OCR has page markers
-    ocr_pages = ocr_text.split("--- Page ")
-    extracted_lines = extracted_text.split('\n')
-    
     # If OCR found significantly more content, prefer OCR
-    if len(ocr_text.strip()) > len(extracted_text.strip()) * 1.5:
+    if ocr_len > extracted_len * 1.5:
         print(f"OCR found more content ({len(ocr_text)} vs {len(extracted_text)} chars), using OCR")
         return ocr_text
     
@@ -857,36 +1202,43 @@ def _merge_extracted_and_ocr_text(extracted_text: str, ocr_text: str) -> str:
     print(f"Combining extracted text ({len(extracted_text)} chars) with OCR ({len(ocr_text)} chars)")
     return extracted_text + "\n\n--- Additional OCR Content ---\n" + ocr_text
 
+def _extract_pdf_page_texts(pdf_path: str) -> List[str]:
+    # The context manager closes the document even on errors, so the temp
+    # file can always be removed afterwards
+    with fitz.open(pdf_path, filetype="pdf") as pdf_document:
+        return [page.get_text() for page in pdf_document]
+
 @router.post("/api/read_pdf")
 async def read_pdf(file: UploadFile = File(...), background_tasks: BackgroundTasks = None):
     if not file.filename.endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Invalid file type. Please upload a PDF.")
+    pdf_path = None
     try:
-        pdf_bytes = await file.read()
-        pdf_document = fitz.open(stream=pdf_bytes, filetype="pdf")
-        
+        # The content hash of the upload doubles as a unique ID for caching
+        pdf_path, task_id = await _save_upload_to_tempfile(file)
         # Always extract direct text first
-        extracted_text = ""
-        for page_num in range(len(pdf_document)):
-            page = pdf_document.load_page(page_num)
-            extracted_text += page.get_text()
-        
-        # Generate a unique ID for caching
-        task_id = hashlib.sha256(pdf_bytes).hexdigest()
-        result_path = os.path.join(OCR_CACHE_DIR, f"{task_id}.txt")
+        page_texts = await asyncio.to_thread(_extract_pdf_page_texts, pdf_path)
+        extracted_text = "".join(page_texts)
         
         # Check if OCR already completed from previous run
-        if os.path.exists(result_path):
-            with open(result_path, "r", encoding="utf-8") as f:
-                ocr_text = f.read()
+        ocr_text = _ocr_cached_text(task_id)
+        if ocr_text is not None:
             merged_text = _merge_extracted_and_ocr_text(extracted_text, ocr_text)
             print(f"Using cached OCR + extracted text ({len(merged_text)} chars total)")
             return JSONResponse(content={"status": "completed", "text": merged_text})
         
-        # Start OCR in background regardless of extracted text
-        print(f"Starting OCR in background (extracted {len(extracted_text)} chars directly)")
+        # Only pages without embedded text need OCR
+        ocr_pages = _pages_needing_ocr(page_texts)
+        if not ocr_pages:
+            print(f"All {len(page_texts)} pages have embedded text, skipping OCR")
+            return JSONResponse(content={"status": "completed", "text": extracted_text})
+        
+        # Start OCR in background for the remaining pages
+        print(f"Starting OCR in background for {len(ocr_pages)} of {len(page_texts)} pages (extracted {len(extracted_text)} chars directly)")
         if background_tasks:
-            background_tasks.add_task(_perform_ocr, pdf_bytes, task_id)
+            # The OCR task takes ownership of the temp file and removes it
+            background_tasks.add_task(_perform_ocr, pdf_path, task_id, page_texts)
+            pdf_path = None
         
         # Return extracted text immediately, OCR will enhance it later
         if extracted_text.strip():
@@ -905,15 +1257,16 @@ async def read_pdf(file: UploadFile = File(...), background_tasks: BackgroundTas
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to read PDF. Reason: {str(e)}")
+    finally:
+        if pdf_path and os.path.exists(pdf_path):
+            os.unlink(pdf_path)
 
 @router.get("/api/ocr_result/{task_id}")
 async def get_ocr_result(task_id: str):
-    result_path = os.path.join(OCR_CACHE_DIR, f"{task_id}.txt")
-    error_path = os.path.join(OCR_CACHE_DIR, f"{task_id}.error")
+    error_path = _ocr_result_path(task_id, "error")
 
-    if os.path.exists(result_path):
-        with open(result_path, "r", encoding="utf-8") as f:
-            text = f.read()
+    text = _ocr_cached_text(task_id)
+    if text is not None:
         return JSONResponse(content={"status": "completed", "text": text})
     elif os.path.exists(error_path):
         with open(error_path, "r", encoding="utf-8") as f:
@@ -922,40 +1275,33 @@ async def get_ocr_result(task_id: str):
     else:
         return JSONResponse(content={"status": "processing"})
 
-@router.post("/api/read_pdf_with_chunks")
-async def read_pdf_with_chunks(file: UploadFile = File(...)):
-    """
-    Extract PDF content with positional information for each text element.
-    Returns both raw text and structured data for rendering interactive text layer.
-    """
-    if not file.filename.endswith(".pdf"):
-        raise HTTPException(status_code=400, detail="Invalid file type. Please upload a PDF.")
-    try:
-        pdf_bytes = await file.read()
-        pdf_document = fitz.open(stream=pdf_bytes, filetype="pdf")
-        
+def _extract_pdf_chunks(pdf_path: str) -> Dict[str, Any]:
+    """Sync worker for read_pdf_with_chunks: full text plus per-span positions."""
+    with fitz.open(pdf_path, filetype="pdf") as pdf_document:
         pages_data = []
-        full_text = ""
+        text_parts = []
         
         for page_num in range(len(pdf_document)):
             page = pdf_document.load_page(page_num)
-            text = page.get_text()
-            full_text += text + "\n"
             
-            # Get text with position information
-            blocks = page.get_text("dict")["blocks"]
+            # Get text with position information; the plain text is rebuilt
+            # from the same spans so each page is only parsed once
+            blocks = page.get_text("dict", flags=PDF_TEXT_FLAGS)["blocks"]
             text_elements = []
             
             for block in blocks:
                 if block.get("type") == 0:  # Text block
                     for line in block.get("lines", []):
                         for span in line.get("spans", []):
+                            text_parts.append(span.get("text", ""))
                             text_elements.append({
                                 "text": span.get("text", ""),
                                 "bbox": span.get("bbox", [0, 0, 0, 0]),  # [x0, y0, x1, y1]
                                 "font": span.get("font", ""),
                                 "size": span.get("size", 12)
                             })
+                        text_parts.append("\n")
+            text_parts.append("\n")
             
             pages_data.append({
                 "page_num": page_num + 1,
@@ -964,17 +1310,48 @@ async def read_pdf_with_chunks(file: UploadFile = File(...)):
                 "text_elements": text_elements
             })
         
-        return JSONResponse(content={
-            "status": "success",
-            "full_text": full_text,
-            "pages": pages_data,
-            "num_pages": len(pdf_document)
-        })
+        num_pages = len(pdf_document)
+    
+    full_text = "".join(text_parts)
+    
+    return {
+        "status": "success",
+        "full_text": full_text,
+        "pages": pages_data,
+        "num_pages": num_pages
+    }
+
+@router.post("/api/read_pdf_with_chunks")
+async def read_pdf_with_chunks(file: UploadFile = File(...)):
+    """
+    Extract PDF content with positional information for each text element.
+    Returns both raw text and structured data for rendering interactive text layer.
+    """
+    if not file.filename.endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Invalid file type. Please upload a PDF.")
+    pdf_path = None
+    try:
+        pdf_path, pdf_hash = await _save_upload_to_tempfile(file)
+        
+        # Layout extraction is the slow part; reuse it for PDFs we've already seen
+        cache_path = os.path.join(OCR_CACHE_DIR, f"{pdf_hash}.chunks.json")
+        cached = _load_cached_json(cache_path)
+        if cached is not None:
+            return FastJSONResponse(content=cached)
+        
+        result = await asyncio.to_thread(_extract_pdf_chunks, pdf_path)
+        _save_cached_json(cache_path, result)
+        
+        return FastJSONResponse(content=result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to read PDF with chunks. Reason: {str(e)}")
+    finally:
+        if pdf_path and os.path.exists(pdf_path):
+            os.unlink(pdf_path)
 
 @router.post("/api/process_pdf_interactive")
-async def process_pdf_interactive(file: UploadFile = File(...), chunk_size: int = 50):
+async def process_pdf_interactive(file: UploadFile = File(...), chunk_size: int = 50,
+                                  page_start: Optional[int] = None, page_end: Optional[int] = None):
     """
     Comprehensive PDF processing endpoint that returns complete structured data
     for client-side rendering, clicking, and word-level highlighting.
@@ -988,31 +1365,59 @@ async def process_pdf_interactive(file: UploadFile = File(...), chunk_size: int
     Args:
         file: PDF file upload
         chunk_size: Number of words per reading chunk (default: 50)
+        page_start, page_end: Only process this page range (1-indexed, inclusive),
+            e.g. to show the first pages before the rest are requested
     
     Returns:
         Complete structured PDF data with pages, elements, and chunks
     """
-    from functions.pdf_processor import process_pdf_for_interactive_reading
+    from functions.pdf_processor import process_pdf_for_interactive_reading, PROCESSING_VERSION
     
     if not file.filename.endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Invalid file type. Please upload a PDF.")
     
+    pdf_path = None
     try:
-        pdf_bytes = await file.read()
+        pdf_path, pdf_hash = await _save_upload_to_tempfile(file)
+        
+        page_range = None
+        range_key = ""
+        if page_start is not None or page_end is not None:
+            page_range = (page_start or 1, page_end or sys.maxsize)
+            range_key = f"_p{page_range[0]}-{page_range[1]}"
         
-        # Process PDF with comprehensive data extraction
-        result = process_pdf_for_interactive_reading(
-            pdf_bytes=pdf_bytes,
-            options={"chunk_size": chunk_size}
+        # The result depends only on the content, chunk size and page range,
+        # so a PDF that was processed before is served straight from the cache
+        cache_path = os.path.join(
+            OCR_CACHE_DIR, f"{pdf_hash}.interactive_{chunk_size}{range_key}_v{PROCESSING_VERSION}.json"
         )
+        result = _load_cached_json(cache_path)
+        if result is None:
+            # Process PDF with comprehensive data extraction
+            result = await asyncio.to_thread(
+                process_pdf_for_interactive_reading,
+                pdf_path=pdf_path,
+                doc_hash=pdf_hash,
+                options={"chunk_size": chunk_size},
+                page_range=page_range
+            )
+            _save_cached_json(cache_path, result)
+        
+        # Same content was OCR'd before (by any user): hand the text back too
+        ocr_text = _ocr_cached_text(pdf_hash)
+        if ocr_text is not None:
+            result["ocr_text"] = ocr_text
         
-        return JSONResponse(content=result)
+        return FastJSONResponse(content=result)
         
     except Exception as e:
         import traceback
         error_detail = f"Failed to process PDF: {str(e)}\n{traceback.format_exc()}"
         print(f"❌ PDF Processing Error: {error_detail}")
         raise HTTPException(status_code=500, detail=error_detail)
+    finally:
+        if pdf_path and os.path.exists(pdf_path):
+            os.unlink(pdf_path)
 
 
 @router.post("/api/get_chunk_highlight")
@@ -1049,7 +1454,9 @@ async def process_text(request: TextProcessRequest):
     Falls back to rule-based splitting if LLM unavailable.
     """
     try:
-        chunks = process_text_for_tts(
+        # The LLM splitter waits on Ollama for up to 30s; keep that off the event loop
+        chunks = await asyncio.to_thread(
+            process_text_for_tts,
             text=request.text,
             chunk_size=request.chunk_size,
             use_llm=request.use_llm
@@ -1062,6 +1469,15 @@ async def process_text(request: TextProcessRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to process text: {str(e)}")
 
+def _read_epub_html(epub_path: str) -> str:
+    book = epub.read_epub(epub_path)
+    full_html = []
+    # The chapter HTML is passed through unchanged, so decode it directly
+    # rather than parsing it into a tree only to serialize it straight back
+    for item in book.get_items_of_type(ebooklib.ITEM_DOCUMENT):
+        full_html.append(item.get_content().decode('utf-8', errors='replace'))
+    return "\n".join(full_html)
+
 @router.post("/api/read_epub", response_model=PdfText)
 async def read_epub(file: UploadFile = File(...)):
     if not file.filename.endswith((".epub", ".opf")):
@@ -1072,41 +1488,49 @@ async def read_epub(file: UploadFile = File(...)):
             temp_epub_file.write(epub_bytes)
             temp_epub_path = temp_epub_file.name
         try:
-            book = epub.read_epub(temp_epub_path)
-            full_html = []
-            for item in book.get_items():
-                if item.get_type() == ebooklib.ITEM_DOCUMENT:
-                    soup = BeautifulSoup(item.content, 'html.parser')
-                    full_html.append(str(soup))
-            return PdfText(text="\n".join(full_html))
+            full_html = await asyncio.to_thread(_read_epub_html, temp_epub_path)
+            return PdfText(text=full_html)
         finally:
             os.unlink(temp_epub_path)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to read EPUB. Reason: {str(e)}")
 
+def _read_docx_text(docx_path: str) -> str:
+    doc = docx.Document(docx_path)
+    return "\n".join([para.text for para in doc.paragraphs])
+
 @router.post("/api/read_docx", response_model=PdfText)
 async def read_docx(file: UploadFile = File(...)):
     if not file.filename.endswith(".docx"):
         raise HTTPException(status_code=400, detail="Invalid file type. Please upload a DOCX file.")
+    docx_path = None
     try:
-        docx_bytes = await file.read()
-        doc = docx.Document(BytesIO(docx_bytes))
-        full_text = []
-        for para in doc.paragraphs:
-            full_text.append(para.text)
-        return PdfText(text="\n".join(full_text))
+        # Stream to disk so python-docx reads the zip from a file rather than
+        # a second in-memory copy of the upload
+        docx_path, _ = await _save_upload_to_tempfile(file, suffix=".docx")
+        text = await asyncio.to_thread(_read_docx_text, docx_path)
+        return PdfText(text=text)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to read DOCX. Reason: {str(e)}")
+    finally:
+        if docx_path and os.path.exists(docx_path):
+            os.unlink(docx_path)
 
 @router.get("/api/clear_cache")
 async def clear_cache():
     try:
         shutil.rmtree(AUDIO_CACHE_DIR)
+        _CACHED_AUDIO.clear()
         os.makedirs(AUDIO_CACHE_DIR)
         return JSONResponse(content={"message": "Cache cleared."})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to clear cache. Reason: {str(e)}")
 
+@functools.lru_cache(maxsize=1)
+def _whisper_model():
+    """Load the Whisper model once and reuse it for every transcription."""
+    return whisper.load_model("tiny")
+
 @router.post("/api/speech_to_text", response_model=SpeechToTextResponse)
 async def speech_to_text(file: UploadFile = File(...)):
     if not file.filename:
@@ -1121,8 +1545,8 @@ async def speech_to_text(file: UploadFile = File(...)):
             temp_audio_file.write(audio_content)
             temp_audio_path = temp_audio_file.name
         try:
-            model = whisper.load_model("tiny")
-            result = model.transcribe(temp_audio_path)
+            model = await asyncio.to_thread(_whisper_model)
+            result = await asyncio.to_thread(model.transcribe, temp_audio_path)
             transcribed_text = result["text"].strip()
             detected_language = result.get("language", None)
             return SpeechToTextResponse(text=transcribed_text, language=detected_language)
@@ -1132,14 +1556,17 @@ async def speech_to_text(file: UploadFile = File(...)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to transcribe audio. Reason: {str(e)}")
 
+def _iter_file_sizes(folder_path):
+    # DirEntry caches the type from readdir, so only regular files cost a stat()
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_file_sizes(entry.path)
+            elif not entry.is_symlink():
+                yield entry.stat(follow_symlinks=False).st_size
+
 def get_folder_size(folder_path):
-    total_size = 0
-    for dirpath, dirnames, filenames in os.walk(folder_path):
-        for f in filenames:
-            fp = os.path.join(dirpath, f)
-            if not os.path.islink(fp):
-                total_size += os.path.getsize(fp)
-    return total_size
+    return sum(_iter_file_sizes(folder_path))
 
 @router.get("/api/cache_size")
 async def get_cache_size():
@@ -1185,12 +1612,9 @@ class BookUpdate(BaseModel):
 @router.post("/api/read_website", response_model=PdfText)
 async def read_website(request: ReadWebsiteRequest):
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        response = requests.get(request.url, headers=headers)
+        response = await asyncio.to_thread(_WEB_HTTP.get, request.url, timeout=30)
         response.raise_for_status()  # Raise an exception for HTTP errors
-        content = extract_readable_content(response.text)
+        content = await asyncio.to_thread(extract_readable_content, response.text)
         return PdfText(text=content)
     except requests.exceptions.RequestException as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch website content: {e}")
@@ -1200,7 +1624,7 @@ async def read_website(request: ReadWebsiteRequest):
 @router.post("/api/detect_lang")
 async def detect_lang(request: DetectLangRequest):
     try:
-        lang = detect(request.text)
+        lang = await asyncio.to_thread(detect, request.text)
         return JSONResponse(content={"language": lang})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to detect language. Reason: {str(e)}")
@@ -1244,20 +1668,25 @@ async def upload_pdf_route(username: str, file: UploadFile = File(...), content:
     if not file.filename.endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Invalid file type. Only PDF files are supported.")
 
-    pdf_content = await file.read()
     # Sanitize the content (which is the desired filename) to prevent path traversal
     sanitized_content = os.path.basename(content) # Ensures only the filename part is used
     filename_with_ext = f"{sanitized_content}.pdf"
 
+    temp_pdf_path = None
     try:
-        # Save the PDF to the user's folder and get the absolute path on the server
-        absolute_pdf_path = user_manager.save_pdf_to_user_folder(username, filename_with_ext, pdf_content)
+        # Stream the upload to disk, then move it into the user's folder
+        temp_pdf_path, pdf_hash = await _save_upload_to_tempfile(file)
+        absolute_pdf_path = user_manager.move_pdf_to_user_folder(username, filename_with_ext, temp_pdf_path)
         
         # Construct the URL that the frontend will use to fetch the PDF
         pdf_fetch_url = f"/api/users/{username}/pdfs/{filename_with_ext}"
 
         # Save book metadata to user's JSON with the fetch URL as content
         book_data = {"title": sanitized_content, "content": pdf_fetch_url, "is_pdf": True}
+        # If this exact PDF was already OCR'd, store the text so the client never re-runs OCR
+        ocr_text = _ocr_cached_text(pdf_hash)
+        if ocr_text is not None:
+            book_data["ocr_text"] = ocr_text
         success, book_id = user_manager.add_book(username, book_data)
         if not success:
             # If book metadata fails to save, attempt to remove the uploaded PDF file
@@ -1272,6 +1701,9 @@ async def upload_pdf_route(username: str, file: UploadFile = File(...), content:
         })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save PDF: {str(e)}")
+    finally:
+        if temp_pdf_path and os.path.exists(temp_pdf_path):
+            os.unlink(temp_pdf_path)
 
 @router.get("/api/users/{username}/pdfs/{filename}")
 async def get_user_pdf(username: str, filename: str):
@@ -1282,82 +1714,36 @@ async def get_user_pdf(username: str, filename: str):
     if not os.path.exists(user_pdf_path):
         raise HTTPException(status_code=404, detail="PDF not found.")
 
-    # Read the PDF file content and return it directly with proper headers
-    with open(user_pdf_path, 'rb') as f:
-        pdf_content = f.read()
-    
-    return Response(
-        content=pdf_content,
+    # Stream the file from disk instead of loading it into memory
+    return FileResponse(
+        user_pdf_path,
         media_type="application/pdf",
-        headers={
-            "Content-Disposition": f"inline; filename={sanitized_filename}",
-            "Accept-Ranges": "bytes",
-            "Cache-Control": "public, max-age=3600"
-        }
+        filename=sanitized_filename,
+        content_disposition_type="inline",
+        headers={"Cache-Control": "public, max-age=3600"}
     )
 
+@router.post("/api/users/{username}/pdfs/{filename}/bytes")
+async def get_user_pdf_bytes(username: str, filename: str):
+    """
+    Stream the raw PDF bytes for the in-app reader. Served to a POST as
+    application/octet-stream without a filename, so download managers like
+    IDM don't intercept it the way they do a GET of an application/pdf.
+    """
+    sanitized_filename = os.path.basename(filename)
+    user_pdf_path = os.path.join(user_manager._get_user_folder(username), sanitized_filename)
+
+    if not os.path.exists(user_pdf_path):
+        raise HTTPException(status_code=404, detail="PDF not found.")
+
+    return FileResponse(user_pdf_path, media_type="application/octet-stream")
+
 def extract_pdf_text_positions(pdf_path: str):
     """Extract text with positions from PDF using PyMuPDF - comprehensive extraction"""
     try:
-        doc = fitz.open(pdf_path)
-        pages_data = []
-        
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            page_dict = {
-                "page_number": page_num + 1,  # 1-based page numbering
-                "width": page.rect.width,
-                "height": page.rect.height,
-                "text_items": []
-            }
-            
-            # Extract text with detailed position information using "dict" method
-            # This provides the most complete text extraction
-            try:
-                blocks = page.get_text("dict")["blocks"]
-                
-                for block in blocks:
-                    if block.get("type") == 0:  # Text block
-                        for line in block.get("lines", []):
-                            for span in line.get("spans", []):
-                                # Only add non-empty text
-                                if span["text"].strip():
-                                    text_item = {
-                                        "text": span["text"],
-                                        "x": span["bbox"][0],  # left
-                                        "y": span["bbox"][1],  # top
-                                        "width": span["bbox"][2] - span["bbox"][0],
-                                        "height": span["bbox"][3] - span["bbox"][1],
-                                        "font": span.get("font", "sans-serif"),
-                                        "size": span.get("size", 12),
-                                        "color": span.get("color", 0)
-                                    }
-                                    page_dict["text_items"].append(text_item)
-            except Exception as e:
-                print(f"Error extracting text from page {page_num + 1}: {e}")
-                # Fallback to simpler text extraction
-                try:
-                    text_content = page.get_text("text")
-                    if text_content.strip():
-                        # Create a single text item for the whole page as fallback
-                        rect = page.rect
-                        page_dict["text_items"].append({
-                            "text": text_content,
-                            "x": rect.x0,
-                            "y": rect.y0,
-                            "width": rect.width,
-                            "height": rect.height,
-                            "font": "sans-serif",
-                            "size": 12,
-                            "color": 0
-                        })
-                except Exception as fallback_error:
-                    print(f"Fallback text extraction also failed for page {page_num + 1}: {fallback_error}")
-            
-            pages_data.append(page_dict)
-            print(f"✅ Page {page_num + 1}: Extracted {len(page_dict['text_items'])} text items")
+        with fitz.open(pdf_path) as doc:
+            pages_data = [extract_page_text_positions(doc[page_num], page_num) for page_num in range(len(doc))]
         
-        doc.close()
         print(f"📄 Total pages processed: {len(pages_data)}")
         return pages_data
     except Exception as e:
@@ -1366,9 +1752,19 @@ def extract_pdf_text_positions(pdf_path: str):
         traceback.print_exc()
         return []
 
+def _hash_file(path: str) -> str:
+    hasher = new_content_hasher()
+    with open(path, "rb") as f:
+        while chunk := f.read(UPLOAD_CHUNK_SIZE):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
 @router.post("/api/users/{username}/pdfs/{filename}/data")
 async def get_user_pdf_data(username: str, filename: str):
-    """Return PDF as base64 JSON data with text positions extracted by PyMuPDF"""
+    """
+    Return text positions extracted by PyMuPDF, plus the URL to POST to for
+    the PDF itself (see get_user_pdf_bytes).
+    """
     # Sanitize filename to prevent path traversal issues
     sanitized_filename = os.path.basename(filename)
     user_pdf_path = os.path.join(user_manager._get_user_folder(username), sanitized_filename)
@@ -1376,19 +1772,20 @@ async def get_user_pdf_data(username: str, filename: str):
     if not os.path.exists(user_pdf_path):
         raise HTTPException(status_code=404, detail="PDF not found.")
 
-    # Read the PDF file content and encode as base64
-    with open(user_pdf_path, 'rb') as f:
-        pdf_content = f.read()
-    
-    pdf_base64 = base64.b64encode(pdf_content).decode('utf-8')
+    # Extract text positions using PyMuPDF, cached by content hash so
+    # re-opening the same PDF skips the parse entirely
+    pdf_hash = await asyncio.to_thread(_hash_file, user_pdf_path)
+    positions_path = os.path.join(OCR_CACHE_DIR, f"{pdf_hash}.positions.json")
+    text_positions = _load_cached_json(positions_path)
+    if text_positions is None:
+        text_positions = await asyncio.to_thread(extract_pdf_text_positions, user_pdf_path)
+        if text_positions:  # an empty list means extraction failed; retry next time
+            _save_cached_json(positions_path, text_positions)
     
-    # Extract text positions using PyMuPDF
-    text_positions = extract_pdf_text_positions(user_pdf_path)
-    
-    return JSONResponse(content={
+    return FastJSONResponse(content={
         "filename": sanitized_filename,
-        "data": pdf_base64,
-        "size": len(pdf_content),
+        "pdf_url": f"/api/users/{username}/pdfs/{sanitized_filename}/bytes",
+        "size": os.path.getsize(user_pdf_path),
         "text_positions": text_positions
     })
 
@@ -1440,7 +1837,8 @@ async def edit_book_route(username: str, book_id: str, book_update: BookUpdate):
 
 async def _generate_and_update_podcast_audio(username: str, podcast_id: str, request: SynthesizeRequest, output_path: str, audio_url: str):
     try:
-        _generate_audio_file(request, output_path)
+        # Synthesis is blocking; running it inline would stall every other request
+        await asyncio.to_thread(_generate_audio_file, request, output_path)
         user_manager.update_podcast(username, podcast_id, {"status": "ready", "audio_url": audio_url})
     except Exception as e:
         print(f"Error generating podcast audio for {username}/{podcast_id}: {e}")
@@ -1486,18 +1884,31 @@ async def generate_podcast_route(username: str, podcast: PodcastGenerate, backgr
     })
 
 
+NOISE_EXTENSIONS = {'wav', 'mp3', 'ogg', 'flac'}
+
+# (directory mtime_ns, files) for the noise folder listing
+_noise_files_cache = None
+_noise_files_lock = threading.Lock()
+
 @router.get("/api/noise_files")
 async def get_noise_files():
     """Get all noise audio files from /static/audio/noise"""
+    global _noise_files_cache
     noise_dir = os.path.join("static", "audio", "noise")
-    if not os.path.exists(noise_dir):
+    try:
+        mtime_ns = os.stat(noise_dir).st_mtime_ns
+    except FileNotFoundError:
         return JSONResponse(content={"files": []})
     
     try:
-        files = []
-        for filename in os.listdir(noise_dir):
-            if filename.lower().endswith(('.wav', '.mp3', '.ogg', '.flac')):
-                files.append(filename)
+        # The directory's mtime changes whenever a file is added, removed or renamed
+        with _noise_files_lock:
+            if _noise_files_cache is not None and _noise_files_cache[0] == mtime_ns:
+                return JSONResponse(content={"files": _noise_files_cache[1]})
+            with os.scandir(noise_dir) as entries:
+                files = [entry.name for entry in entries
+                         if entry.is_file(follow_symlinks=False) and entry.name.rpartition('.')[2].lower() in NOISE_EXTENSIONS]
+            _noise_files_cache = (mtime_ns, files)
         return JSONResponse(content={"files": files})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to read noise files: {str(e)}")
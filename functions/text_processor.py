@@ -2,54 +2,146 @@
 Text processing utilities for semantic sentence splitting and text extraction.
 """
 import re
+import hashlib
+import threading
 import requests
-from typing import List, Dict, Optional
+from collections import OrderedDict
+from typing import Any, List, Dict, Iterable, Iterator, Optional
 import json
 
 
+def _trie_regex(words: List[str]) -> str:
+    """
+    Build a case-insensitive alternation in which words sharing a prefix share
+    one branch (e.g. Mr/Mrs/Ms -> m(?:rs?|s)), so the regex engine walks a
+    common prefix once instead of retrying it for every alternative.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word.lower():
+            node = node.setdefault(char, {})
+        node[''] = {}  # end-of-word marker
+    
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            return f'(?:{pattern})?'
+        return pattern
+    
+    return build(trie)
+
+
+# Common abbreviations that shouldn't end sentences
+_ABBREVIATIONS = ['Mr', 'Mrs', 'Ms', 'Dr', 'Prof', 'Sr', 'Jr', 'vs', 'etc', 'Inc', 'Ltd', 'Corp', 'St', 'Ave', 'Rd', 'Blvd',
+                  'approx', 'min', 'max', 'e.g', 'i.e', 'vol', 'pp', 'ca', 'cf', 'ed', 'al', 'seq', 'c.f']
+_ABBREV_MAX_LEN = max(len(abbreviation) for abbreviation in _ABBREVIATIONS)
+# Matches an abbreviation ending exactly at the search window's end, i.e.
+# right before the period being considered as a sentence boundary
+_ABBREV_TAIL_RE = re.compile(f'{_trie_regex(_ABBREVIATIONS)}\\Z', re.IGNORECASE)
+# Chunk boundaries, matched in one scan: the whitespace after . ! ? when a
+# capital letter or an opening quote (straight or smart) follows, or the
+# whitespace after a comma. The group name says which one matched.
+_BOUNDARY_RE = re.compile(
+    r'(?P<sent>(?<=[.!?])\s+(?=[A-Z"\'\u201C\u201D\u2018\u2019]))|(?P<clause>(?<=,)\s+)'
+)
+
+
 def split_into_sentences_rule_based(text: str) -> List[str]:
     """
     Rule-based sentence splitter as fallback.
     Handles common abbreviations, quotes, commas, and edge cases.
     Splits on periods, commas, and other punctuation for better semantic chunking.
     """
-    # Common abbreviations that shouldn't end sentences
-    abbreviations = r'(?:Mr|Mrs|Ms|Dr|Prof|Sr|Jr|vs|etc|Inc|Ltd|Corp|St|Ave|Rd|Blvd|approx|min|max|e\.g|i\.e|vol|pp|ca|cf|ed|al|seq|c\.f)'
-    
-    # Replace abbreviations temporarily
-    text = re.sub(f'({abbreviations})\.', r'\1<TEMP_PERIOD>', text, flags=re.IGNORECASE)
+    return list(_iter_rule_based_chunks(text))
+
+
+def _iter_rule_based_chunks(text: str) -> Iterator[str]:
+    """Generator behind split_into_sentences_rule_based; yields each chunk as soon as it's cut."""
+    # Sentence and comma boundaries come from a single pass over the text;
+    # commas stay with the preceding clause. A period closing an
+    # abbreviation is checked in place and skipped, so the text never has
+    # to be rewritten with placeholders.
+    prev = 0
+    for match in _BOUNDARY_RE.finditer(text):
+        if match.lastgroup == 'sent':
+            period = match.start() - 1
+            if text[period] == '.' and _ABBREV_TAIL_RE.search(text, max(0, period - _ABBREV_MAX_LEN), period):
+                continue
+        piece = text[prev:match.start()].strip()
+        if piece:
+            yield piece
+        prev = match.end()
+    tail = text[prev:].strip()
+    if tail:
+        yield tail
+
+
+# The LLM sees at most this many characters per request; longer texts are
+# sent in several windows cut at paragraph boundaries
+LLM_WINDOW_CHARS = 2000
+# Texts shorter than this are never worth a round trip to the LLM
+LLM_MIN_TEXT_CHARS = 200
+LLM_NUM_CTX = 2048
+_PARAGRAPH_RE = re.compile(r'\n\s*\n')
+_JSON_DECODER = json.JSONDecoder()
+
+# Keep-alive session so consecutive splits reuse the connection to Ollama
+_LLM_HTTP = requests.Session()
+
+class _LRUCache:
+    """Bounded, thread-safe LRU of string lists; get and put hand out copies."""
     
-    # First split on sentence boundaries: . ! ? followed by space
-    # Handle both straight quotes (") and smart quotes (" " ' ')
-    sentences = re.split(r'(?<=[.!?])\s+(?=[A-Z"\'""''\u201C\u201D\u2018\u2019])', text)
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._lock = threading.Lock()
     
-    # Further split each sentence on commas for better semantic chunking
-    semantic_chunks = []
-    for sentence in sentences:
-        # Split on commas followed by space, keeping the comma with the preceding text
-        parts = re.split(r'(,\s+)', sentence)
-        
-        # Reconstruct chunks with commas attached
-        current_chunk = ""
-        for i, part in enumerate(parts):
-            if part.strip():  # Skip empty parts
-                current_chunk += part
-                # If this is a comma separator or we're at the end, finalize the chunk
-                if part == ', ' or i == len(parts) - 1:
-                    if current_chunk.strip():
-                        semantic_chunks.append(current_chunk.strip())
-                        current_chunk = ""
+    def get(self, key: str) -> Optional[List[str]]:
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                return None
+            self._items.move_to_end(key)
+            return list(value)
     
-    # Restore abbreviations
-    semantic_chunks = [s.replace('<TEMP_PERIOD>', '.').strip() for s in semantic_chunks if s.strip()]
+    def put(self, key: str, value: List[str]):
+        with self._lock:
+            self._items[key] = list(value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
     
-    # Filter out empty chunks
-    semantic_chunks = [s for s in semantic_chunks if len(s) > 0]
-    
-    return semantic_chunks
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._items
+
+
+# Successful LLM splits keyed by a digest of (endpoint, text), so re-processing
+# the same article skips the round-trip to Ollama
+_SEMANTIC_CACHE = _LRUCache(maxsize=512)
+
+
+def _semantic_cache_key(text: str, llm_url: str) -> str:
+    return hashlib.blake2b(f"{llm_url}\0{text}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+# Final chunk lists keyed by a digest of (chunk_size, use_llm, text), so
+# re-processing the same text skips splitting and chunking altogether
+_CHUNK_CACHE = _LRUCache(maxsize=256)
+
 
+def _chunk_cache_key(text: str, chunk_size: int, use_llm: bool) -> str:
+    return hashlib.blake2b(f"{chunk_size}\0{int(use_llm)}\0{text}".encode("utf-8"), digest_size=16).hexdigest()
 
-def split_into_sentences_semantic(text: str, llm_url: str = "http://localhost:11434/api/generate") -> List[str]:
+
+OLLAMA_URL = "http://localhost:11434/api/generate"
+
+
+def split_into_sentences_semantic(text: str, llm_url: str = OLLAMA_URL) -> List[str]:
     """
     Use local Qwen2.5 LLM to semantically split text into sentences.
     Falls back to rule-based splitting if LLM unavailable.
@@ -62,50 +154,88 @@ def split_into_sentences_semantic(text: str, llm_url: str = "http://localhost:11
         List of semantically meaningful sentences
     """
     # If text is short, just use rule-based
-    if len(text) < 200:
+    if len(text) < LLM_MIN_TEXT_CHARS:
         return split_into_sentences_rule_based(text)
     
-    try:
-        # Prepare prompt for Qwen2.5
-        prompt = f"""Split the following text into semantically meaningful chunks for text-to-speech. IMPORTANT:
-- Keep ALL text content - do not skip or omit anything
-- Split on natural boundaries: periods (.), commas (,), semicolons (;), and other punctuation
-- Preserve names in quotes (like "John Smith") as part of the chunk
-- Keep dialogue and quotes as complete units
-- Create smaller chunks (15-30 words each) for better highlighting during speech
-- Each chunk should be a complete phrase or clause
-- Maintain complete thoughts within each chunk
+    cache_key = _semantic_cache_key(text, llm_url)
+    cached = _SEMANTIC_CACHE.get(cache_key)
+    if cached is not None:
+        print(f"LLM semantic splitting served from cache: {len(cached)} sentences")
+        return cached
+    
+    sentences = []
+    for window in _iter_llm_windows(text):
+        window_sentences = _split_window_with_llm(window, llm_url)
+        if window_sentences is None:
+            # Fallback to rule-based
+            return split_into_sentences_rule_based(text)
+        sentences.extend(window_sentences)
+    
+    print(f"LLM semantic splitting succeeded: {len(sentences)} sentences")
+    _SEMANTIC_CACHE.put(cache_key, sentences)
+    return sentences
+
+
+def _iter_llm_windows(text: str) -> Iterator[str]:
+    """
+    Cut text into pieces of at most LLM_WINDOW_CHARS at paragraph boundaries,
+    so long inputs are split in several calls instead of silently truncated.
+    A single paragraph that is too long is cut at sentence boundaries.
+    """
+    window, window_len = [], 0
+    for paragraph in _PARAGRAPH_RE.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        pieces = [paragraph] if len(paragraph) <= LLM_WINDOW_CHARS else _iter_chunks(_iter_rule_based_chunks(paragraph), LLM_WINDOW_CHARS)
+        for piece in pieces:
+            if window and window_len + 2 + len(piece) > LLM_WINDOW_CHARS:
+                yield "\n\n".join(window)
+                window, window_len = [], 0
+            window.append(piece)
+            window_len += len(piece) + 2
+    if window:
+        yield "\n\n".join(window)
 
-Return ONLY a JSON array of text chunks with ALL original text preserved.
 
-Text:
-{text[:2000]}
+def _split_window_with_llm(text: str, llm_url: str) -> Optional[List[str]]:
+    """Ask the LLM to split one window of text. Returns None if the LLM is unavailable or its answer unusable."""
+    try:
+        # Ollama's JSON mode guarantees parseable output; it has to be an object, so the chunks come wrapped
+        prompt = f"""Split this text into text-to-speech chunks of 15-30 words, each a complete clause, keeping ALL text unchanged. Reply as {{"chunks": ["...", "..."]}}.
 
-Format: ["chunk1", "chunk2", "chunk3", ...]"""
+{text}"""
 
         payload = {
             "model": "qwen2.5:latest",
             "prompt": prompt,
             "stream": False,
+            "format": "json",
             "options": {
                 "temperature": 0.1,  # Low temperature for consistent output
-                "num_predict": 1000
+                "num_predict": 1000,
+                # Fixed on purpose: Ollama reloads the model whenever num_ctx changes
+                "num_ctx": LLM_NUM_CTX
             }
         }
         
-        response = requests.post(llm_url, json=payload, timeout=30)
+        response = _LLM_HTTP.post(llm_url, json=payload, timeout=30)
         
         if response.status_code == 200:
             result = response.json()
             llm_output = result.get('response', '').strip()
             
-            # Extract JSON array from response
-            json_match = re.search(r'\[.*\]', llm_output, re.DOTALL)
-            if json_match:
-                sentences = json.loads(json_match.group(0))
-                if sentences and isinstance(sentences, list):
-                    print(f"LLM semantic splitting succeeded: {len(sentences)} sentences")
-                    return [s.strip() for s in sentences if s.strip()]
+            # Extract JSON array from response: decode from the first '[' and
+            # stop at its matching bracket instead of regex-scanning the reply
+            sentences = None
+            start = llm_output.find('[')
+            if start >= 0:
+                try:
+                    sentences, _ = _JSON_DECODER.raw_decode(llm_output, start)
+                except json.JSONDecodeError:
+                    sentences = None
+            if sentences and isinstance(sentences, list):
+                return [s.strip() for s in sentences if isinstance(s, str) and s.strip()]
         
         print("LLM response invalid, falling back to rule-based splitting")
         
@@ -116,59 +246,128 @@ Format: ["chunk1", "chunk2", "chunk3", ...]"""
     except Exception as e:
         print(f"LLM error: {e}, falling back to rule-based splitting")
     
-    # Fallback to rule-based
-    return split_into_sentences_rule_based(text)
+    return None
 
 
-def chunk_sentences(sentences: List[str], max_chunk_size: int = 200) -> List[str]:
+def chunk_sentences(sentences: Iterable[str], max_chunk_size: int = 200) -> List[str]:
     """
     Group semantic text chunks that don't exceed max_chunk_size.
     Preserves semantic boundaries (sentences, clauses, phrases) for better highlighting.
     
     Args:
-        sentences: List of semantic text chunks (can be sentences, clauses, or phrases)
+        sentences: Semantic text chunks (can be sentences, clauses, or phrases);
+            any iterable, including a generator
         max_chunk_size: Maximum characters per chunk
     
     Returns:
         List of text chunks ready for TTS
     """
-    chunks = []
-    current_chunk = []
-    current_size = 0
+    # The fast path below measures the input before packing it, so an
+    # iterator has to be materialized first
+    if not isinstance(sentences, (list, tuple)):
+        sentences = list(sentences)
+    
+    # Fast path: if everything fits in one chunk even with a separator per
+    # sentence, skip the packing loop (common for short screen-reader text)
+    if sum(map(len, sentences)) + len(sentences) <= max_chunk_size:
+        joined = ' '.join(s for s in (sentence.strip() for sentence in sentences) if s)
+        return [joined] if joined else []
+    return list(_iter_chunks(sentences, max_chunk_size))
+
+
+def _iter_chunks(sentences: Iterable[str], max_chunk_size: int) -> Iterator[str]:
+    """Generator behind chunk_sentences; consumes sentences lazily and yields chunks at flush points."""
+    # buf_len is the length of ' '.join(buf); starting at -1 lets every
+    # sentence add its separating space uniformly
+    buf, buf_len = [], -1
     
     for sentence in sentences:
         sentence = sentence.strip()
         if not sentence:
             continue
-            
+        
         sentence_len = len(sentence)
         
         # If single sentence exceeds max, add it as its own chunk
         if sentence_len > max_chunk_size:
             # Save any current chunk first
-            if current_chunk:
-                chunks.append(' '.join(current_chunk))
-                current_chunk = []
-                current_size = 0
-            # Add the long sentence as its own chunk
-            chunks.append(sentence)
+            if buf:
+                yield ' '.join(buf)
+                buf, buf_len = [], -1
+            yield sentence
             continue
         
         # If adding this sentence exceeds limit and we have content, save current chunk
-        if current_chunk and current_size + sentence_len + 1 > max_chunk_size:
-            chunks.append(' '.join(current_chunk))
-            current_chunk = []
-            current_size = 0
+        if buf and buf_len + 1 + sentence_len > max_chunk_size:
+            yield ' '.join(buf)
+            buf, buf_len = [], -1
         
-        # Add sentence to current chunk
-        current_chunk.append(sentence)
-        current_size += sentence_len + (1 if current_chunk else 0)  # +1 for space between sentences
+        buf.append(sentence)
+        buf_len += 1 + sentence_len
     
     # Add remaining sentences
-    if current_chunk:
-        chunks.append(' '.join(current_chunk))
+    if buf:
+        yield ' '.join(buf)
+
+
+# Separators for recursive_split, coarsest first: paragraphs, lines,
+# sentences, clauses, then words
+_SEPARATORS = ['\n\n', '\n', '. ', '! ', '? ', '; ', ', ', ' ']
+
+
+def recursive_split(text: str, max_chunk_size: int = 200, separators: List[str] = _SEPARATORS) -> List[str]:
+    """
+    Split text into chunks of at most max_chunk_size by descending through separators.
+    Only pieces that are still too long are split at the next, finer separator,
+    so chunks break at the coarsest boundary that fits.
     
-    return chunks
+    Args:
+        text: Text to split
+        max_chunk_size: Maximum characters per chunk
+        separators: Separators to try, coarsest first
+    
+    Returns:
+        List of text chunks ready for TTS
+    """
+    text = text.strip()
+    if not text:
+        return []
+    if len(text) <= max_chunk_size:
+        return [text]
+    
+    for idx, sep in enumerate(separators):
+        if sep in text:
+            break
+    else:
+        # Nothing left to split on; keep it whole like chunk_sentences does
+        return [text]
+    
+    # Keep the separator's punctuation with the piece before it
+    parts = text.split(sep)
+    tail = sep.strip()
+    finer = separators[idx + 1:]
+    pieces = []
+    for i, part in enumerate(parts):
+        if tail and i < len(parts) - 1:
+            part += tail
+        if len(part) > max_chunk_size:
+            pieces.extend(recursive_split(part, max_chunk_size, finer))
+        else:
+            pieces.append(part)
+    
+    # Pack neighbouring pieces back together up to the size limit
+    return list(_iter_chunks(pieces, max_chunk_size))
+
+
+def _tally(items: Iterable[str], stats: Dict[str, Any]) -> Iterator[str]:
+    """Pass items through unchanged while recording count, total length, and first/last item."""
+    for item in items:
+        if stats["first"] is None:
+            stats["first"] = item
+        stats["last"] = item
+        stats["count"] += 1
+        stats["chars"] += len(item)
+        yield item
 
 
 def process_text_for_tts(text: str, chunk_size: int = 200, use_llm: bool = True) -> List[str]:
@@ -189,26 +388,49 @@ def process_text_for_tts(text: str, chunk_size: int = 200, use_llm: bool = True)
     
     print(f"Processing text (length: {len(text)}, use_llm: {use_llm})")
     
-    # Split into semantic chunks (sentences, clauses, phrases)
-    if use_llm:
+    cache_key = _chunk_cache_key(text, chunk_size, use_llm)
+    cached = _CHUNK_CACHE.get(cache_key)
+    if cached is not None:
+        print(f"Processed text served from cache: {len(cached)} TTS chunks")
+        return cached
+    
+    # Without the LLM, split recursively on the coarsest boundary that fits
+    if not use_llm:
+        chunks = recursive_split(text, chunk_size)
+        print(f"Processed text: recursive split → {len(chunks)} TTS chunks")
+        _CHUNK_CACHE.put(cache_key, chunks)
+        return chunks
+    
+    # Split into semantic chunks (sentences, clauses, phrases). The LLM path
+    # has to parse a whole JSON array; the rule-based splitter streams
+    # straight into chunking without building an intermediate list, and
+    # short texts go that way directly instead of through the LLM path.
+    if len(text) >= LLM_MIN_TEXT_CHARS:
         semantic_chunks = split_into_sentences_semantic(text)
     else:
-        semantic_chunks = split_into_sentences_rule_based(text)
+        semantic_chunks = _iter_rule_based_chunks(text)
     
-    # Debug: Log first few chunks to verify semantic splitting
-    if semantic_chunks:
-        print(f"First semantic chunk: {semantic_chunks[0][:100]}...")
-        if len(semantic_chunks) > 1:
-            print(f"Last semantic chunk: {semantic_chunks[-1][:100]}...")
+    # Group into final chunks respecting max size, tallying both sides on the
+    # way through for the debug log and the loss check
+    semantic_stats = {"count": 0, "chars": 0, "first": None, "last": None}
+    chunk_stats = {"count": 0, "chars": 0, "first": None, "last": None}
+    chunks = list(_tally(_iter_chunks(_tally(semantic_chunks, semantic_stats), chunk_size), chunk_stats))
     
-    # Group into final chunks respecting max size
-    chunks = chunk_sentences(semantic_chunks, chunk_size)
+    # Debug: Log first few chunks to verify semantic splitting
+    if semantic_stats["count"]:
+        print(f"First semantic chunk: {semantic_stats['first'][:100]}...")
+        if semantic_stats["count"] > 1:
+            print(f"Last semantic chunk: {semantic_stats['last'][:100]}...")
     
     # Verify all text is preserved
-    total_semantic_chars = sum(len(s) for s in semantic_chunks)
-    total_chunk_chars = sum(len(c) for c in chunks)
+    total_semantic_chars = semantic_stats["chars"]
+    total_chunk_chars = chunk_stats["chars"]
     if total_chunk_chars < total_semantic_chars * 0.95:  # Allow 5% for whitespace normalization
         print(f"⚠️ WARNING: Text loss detected! Semantic: {total_semantic_chars} chars → Chunks: {total_chunk_chars} chars")
     
-    print(f"Processed text: {len(semantic_chunks)} semantic chunks → {len(chunks)} TTS chunks")
+    print(f"Processed text: {semantic_stats['count']} semantic chunks → {len(chunks)} TTS chunks")
+    # A rule-based fallback for a long text isn't kept, so the next request
+    # gives the LLM another chance; a successful split is in the semantic cache
+    if len(text) < LLM_MIN_TEXT_CHARS or _semantic_cache_key(text, OLLAMA_URL) in _SEMANTIC_CACHE:
+        _CHUNK_CACHE.put(cache_key, chunks)
     return chunks
@@ -1,6 +1,7 @@
 import hashlib
 import json
 import os
+import shutil
 import uuid
 from bcrypt import hashpw, gensalt, checkpw
 
@@ -20,14 +21,13 @@ class UserManager:
         user_hash = hashlib.sha256(username.encode('utf-8')).hexdigest()
         return os.path.join(self.users_dir, user_hash)
 
-    def save_pdf_to_user_folder(self, username: str, filename: str, pdf_content: bytes):
+    def move_pdf_to_user_folder(self, username: str, filename: str, source_path: str):
         user_folder = self._get_user_folder(username)
         # Sanitize filename to prevent path traversal issues
         sanitized_filename = os.path.basename(filename)
         pdf_path = os.path.join(user_folder, sanitized_filename)
-        
-        with open(pdf_path, "wb") as f:
-            f.write(pdf_content)
+
+        shutil.move(source_path, pdf_path)
 
         return pdf_path
 
@@ -4,29 +4,50 @@ Modern cross-platform desktop application using PyQt6 and Piper TTS
 """
 
 import sys
+import bisect
+import codecs
+import io
 import json
+import mmap
+import struct
 import threading
+import time
 import wave
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import Callable, Iterator, Optional, List, Dict, Tuple
 import re
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QTextEdit, QPushButton, QComboBox, QSlider, QLabel, QFileDialog,
+    QTextEdit, QPlainTextEdit, QPushButton, QComboBox, QSlider, QLabel, QFileDialog,
     QProgressBar, QTabWidget, QSpinBox, QCheckBox, QGroupBox, QMessageBox,
     QSplitter, QStatusBar
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer, QSettings
+from PyQt6.QtCore import Qt, QThread, QThreadPool, QRunnable, QObject, pyqtSignal, QTimer, QSettings
 from PyQt6.QtGui import QFont, QTextCursor, QTextCharFormat, QColor, QPalette, QIcon
 
 # Document readers
 import fitz  # PyMuPDF
-from docx import Document
+import zipfile
+from xml.etree import ElementTree
 import ebooklib
 from ebooklib import epub
 from bs4 import BeautifulSoup
 
+# Faster HTML-to-text for EPUB chapters when available: selectolax is a C
+# parser that yields text without building a soup, lxml speeds up bs4
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
+try:
+    import lxml  # noqa: F401
+    BS_PARSER = 'lxml'
+except ImportError:
+    BS_PARSER = 'html.parser'
+
 # TTS Engine
 import subprocess
 import tempfile
@@ -34,21 +55,134 @@ import os
 
 # Audio playback
 try:
-    import pygame
-    pygame.mixer.init()
+    import numpy as np
+    import sounddevice as sd
     AUDIO_AVAILABLE = True
 except ImportError:
     AUDIO_AVAILABLE = False
-    print("Warning: pygame not available. Install with: pip install pygame")
+    print("Warning: sounddevice not available. Install with: pip install sounddevice numpy")
+
+# In-process Piper: voices load once into onnxruntime and return raw PCM
+# directly; without it every voice runs in a piper CLI process
+try:
+    from piper import PiperVoice
+    PIPER_MODULE_AVAILABLE = True
+except ImportError:
+    PIPER_MODULE_AVAILABLE = False
+
+# piper-tts 1.3 replaced synthesize_stream_raw with synthesize(), which
+# takes a SynthesisConfig and yields AudioChunks
+try:
+    from piper import SynthesisConfig
+except ImportError:
+    SynthesisConfig = None
+
+# Samples handed to the output stream per write; small enough that pause
+# and stop take effect within a fraction of a second
+PLAYBACK_BLOCK = 4096
+
+# Piper processes rendering an export at once. Each loads its own copy of
+# the model and onnxruntime gives each one a thread per core, so a few
+# already keep the CPU busy
+EXPORT_WORKERS = max(1, min(4, (os.cpu_count() or 1) // 2))
+
+# TXT files larger than this are shown a chunk at a time while they load
+TXT_STREAM_THRESHOLD = 1 << 20
+TXT_STREAM_CHUNK = 1 << 20
+
+# 2 ms fades at sentence joins so back-to-back sentences don't click
+FADE_MS = 2
+
+
+def _apply_fades(samples: "np.ndarray", sample_rate: int) -> "np.ndarray":
+    """Return a copy of int16 samples with a short linear fade-in and fade-out"""
+    fade = min(sample_rate * FADE_MS // 1000, len(samples) // 2)
+    samples = samples.copy()
+    if fade:
+        ramp = np.linspace(0.0, 1.0, fade, dtype=np.float32)
+        samples[:fade] = (samples[:fade] * ramp).astype(np.int16)
+        samples[-fade:] = (samples[-fade:] * ramp[::-1]).astype(np.int16)
+    return samples
+
+
+# A sentence runs up to and including its closing punctuation and the
+# whitespace after it; whatever follows the last one is the final sentence
+_SENT_RE = re.compile(r'.*?[.!?]+\s+|.+', re.DOTALL)
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences"""
+    sentences = [text[start:end] for start, end in split_sentence_spans(text)]
+    return sentences if sentences else [text]
+
+
+def split_sentence_spans(text: str) -> List[Tuple[int, int]]:
+    """Return the (start, end) offsets of each sentence in text, surrounding whitespace excluded"""
+    spans = []
+    for match in _SENT_RE.finditer(text):
+        sentence = match.group()
+        stripped = sentence.strip()
+        if stripped:
+            start = match.start() + len(sentence) - len(sentence.lstrip())
+            spans.append((start, start + len(stripped)))
+    return spans
+
+
+# WordprocessingML tags read when extracting DOCX text
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_PARAGRAPH = _W_NS + "p"
+_W_RUN = _W_NS + "r"
+_W_TEXT = _W_NS + "t"
+_W_TAB = _W_NS + "tab"
+_W_BREAKS = {_W_NS + "br", _W_NS + "cr"}
+
+
+def _html_to_text(html: bytes) -> str:
+    """Extract the text content of an HTML document"""
+    if HTMLParser is not None:
+        return HTMLParser(html).text()
+    return BeautifulSoup(html, BS_PARSER).get_text()
+
+
+def _wav_header(data_size: int, sample_rate: int, channels: int = 1, sample_width: int = 2) -> bytes:
+    """Build a 44-byte PCM WAV header for data_size bytes of audio"""
+    block_align = channels * sample_width
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, 1, channels, sample_rate, sample_rate * block_align, block_align, sample_width * 8,
+        b"data", data_size
+    )
 
 
 class PiperTTS:
     """Local Piper TTS engine wrapper"""
     
-    def __init__(self, models_dir: str = "models/piper"):
+    # In-process voices by model path, shared by all engines; None marks a
+    # model that failed to load so it isn't retried on every sentence
+    _loaded_voices: Dict[Path, Optional["PiperVoice"]] = {}
+    _load_lock = threading.Lock()
+    
+    def __init__(self, models_dir: str = "models/piper", voices: Optional[Dict[str, Path]] = None):
         self.models_dir = Path(models_dir)
         self.voices: Dict[str, Path] = {}
-        self.discover_voices()
+        # One long-lived Piper process so the model loads once, not per sentence
+        self._process: Optional[subprocess.Popen] = None
+        self._process_key = None
+        self._proc_lock = threading.Lock()
+        # Piper writes each utterance here before it is read into memory
+        self._scratch_path: Optional[str] = None
+        # Cleared when Piper can't serve --json-input requests (older builds);
+        # synthesis then falls back to one batch run per call
+        self.json_input_supported = True
+        self._process_answered = False
+        # Parsed .onnx.json configs by voice, read on first use
+        self._configs: Dict[str, dict] = {}
+        if voices is None:
+            self.discover_voices()
+        else:
+            # Already-scanned voices, e.g. for an extra engine in a parallel export
+            self.voices = dict(voices)
         
     def discover_voices(self):
         """Scan for available Piper voice models"""
@@ -56,60 +190,240 @@ class PiperTTS:
             print(f"Models directory not found: {self.models_dir}")
             return
             
-        for onnx_file in self.models_dir.glob("*.onnx"):
-            json_file = onnx_file.with_suffix(".onnx.json")
-            if json_file.exists():
-                voice_name = onnx_file.stem
-                self.voices[voice_name] = onnx_file
+        # One directory listing covers both the models and their configs
+        with os.scandir(self.models_dir) as entries:
+            names = {entry.name for entry in entries}
+        
+        for name in names:
+            if name.endswith(".onnx") and name + ".json" in names:
+                self.voices[name[:-len(".onnx")]] = self.models_dir / name
                 
         print(f"Found {len(self.voices)} Piper voices: {list(self.voices.keys())}")
     
-    def synthesize(self, text: str, voice: str, output_path: str, speed: float = 1.0) -> bool:
-        """Generate speech using Piper"""
+    def voice_config(self, voice: str) -> dict:
+        """Parsed config of a voice, read from disk once"""
+        config = self._configs.get(voice)
+        if config is None:
+            with open(f"{self.voices[voice]}.json", 'rb') as f:
+                config = json.loads(f.read())
+            self._configs[voice] = config
+        return config
+    
+    def sample_rate(self, voice: str) -> Optional[int]:
+        """Output sample rate of a voice, or None if its config can't tell"""
+        try:
+            return int(self.voice_config(voice)["audio"]["sample_rate"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+    
+    def synthesize(self, text: str, voice: str, speed: float = 1.0) -> Optional[Tuple[bytes, int]]:
+        """Generate speech using Piper; returns (16-bit mono PCM, sample rate)"""
         if voice not in self.voices:
             print(f"Voice {voice} not found")
-            return False
-            
-        model_path = self.voices[voice]
+            return None
+        
+        if PIPER_MODULE_AVAILABLE:
+            piper_voice = self._load_voice(voice)
+            if piper_voice is not None:
+                try:
+                    if hasattr(piper_voice, "synthesize_stream_raw"):  # piper-tts 1.2
+                        pcm = b"".join(piper_voice.synthesize_stream_raw(text, length_scale=1.0 / speed))
+                    else:
+                        syn_config = SynthesisConfig(length_scale=1.0 / speed)
+                        pcm = b"".join(chunk.audio_int16_bytes for chunk in piper_voice.synthesize(text, syn_config=syn_config))
+                    return pcm, piper_voice.config.sample_rate
+                except Exception as e:
+                    print(f"TTS synthesis error: {e}")
+                    return None
+        
+        if not self.json_input_supported:
+            batch = self.synthesize_batch([text], voice, speed)
+            return batch[0] if batch else None
         
         try:
-            # Check for piper executable
-            piper_exe = self._find_piper_executable()
-            if not piper_exe:
-                print("Piper executable not found. Please install Piper.")
-                return False
-            
-            # Piper command: echo "text" | piper -m model.onnx -f output.wav
-            cmd = [
-                str(piper_exe),
-                "--model", str(model_path),
-                "--output_file", output_path
-            ]
-            
-            # Add speed control if supported
-            if speed != 1.0:
-                cmd.extend(["--length_scale", str(1.0 / speed)])
-            
-            # Run Piper
-            process = subprocess.Popen(
-                cmd,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
-            
-            stdout, stderr = process.communicate(input=text)
-            
-            if process.returncode == 0 and Path(output_path).exists():
-                return True
-            else:
-                print(f"Piper error: {stderr}")
-                return False
+            with self._proc_lock:
+                process = self._ensure_process(voice, speed)
+                if process is None:
+                    return None
+                
+                # One JSON line per utterance; Piper writes the WAV and
+                # prints its path once the file is complete. Every utterance
+                # reuses the same scratch file and is read straight back.
+                request = json.dumps({"text": text, "output_file": self._scratch_path})
+                try:
+                    process.stdin.write(request + "\n")
+                    process.stdin.flush()
+                    answered = bool(process.stdout.readline())
+                except BrokenPipeError:
+                    answered = False
+                
+                if not answered:
+                    print(f"Piper error: process exited with code {process.wait()}")
+                    if not self._process_answered:
+                        # Died before serving a single request: no --json-input support
+                        self.json_input_supported = False
+                    self._process = None
+                    return None
+                self._process_answered = True
+                
+                with wave.open(self._scratch_path, 'rb') as wav:
+                    return wav.readframes(wav.getnframes()), wav.getframerate()
+                
+        except Exception as e:
+            print(f"TTS synthesis error: {e}")
+            return None
+    
+    def synthesize_batch(self, sentences: List[str], voice: str, speed: float = 1.0,
+                         on_progress: Optional[Callable[[int], None]] = None) -> Optional[List[Tuple[bytes, int]]]:
+        """Synthesize several sentences in one Piper run, so the model loads once per batch"""
+        if voice not in self.voices:
+            print(f"Voice {voice} not found")
+            return None
+        
+        piper_exe = self._find_piper_executable()
+        if not piper_exe:
+            print("Piper executable not found. Please install Piper.")
+            return None
+        
+        try:
+            with tempfile.TemporaryDirectory() as out_dir:
+                # Piper writes one WAV per input line, named by timestamp
+                cmd = [str(piper_exe), "--model", str(self.voices[voice]), "--output_dir", out_dir]
+                if speed != 1.0:
+                    cmd.extend(["--length_scale", str(1.0 / speed)])
+                
+                process = subprocess.Popen(
+                    cmd,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    text=True,
+                    encoding='utf-8'
+                )
+                process.stdin.write("\n".join(s.replace("\n", " ") for s in sentences) + "\n")
+                process.stdin.close()
+                
+                # Report progress from the files Piper has produced so far
+                while process.poll() is None:
+                    if on_progress:
+                        on_progress(len(os.listdir(out_dir)))
+                    time.sleep(0.1)
+                
+                names = sorted(os.listdir(out_dir), key=lambda name: (len(name), name))
+                if process.returncode != 0 or len(names) != len(sentences):
+                    print(f"Piper error: batch run exited with code {process.returncode}, "
+                          f"{len(names)} of {len(sentences)} sentences written")
+                    return None
+                
+                results = []
+                for name in names:
+                    with wave.open(os.path.join(out_dir, name), 'rb') as wav:
+                        results.append((wav.readframes(wav.getnframes()), wav.getframerate()))
+                return results
                 
         except Exception as e:
             print(f"TTS synthesis error: {e}")
-            return False
+            return None
+    
+    def runs_in_process(self, voice: str) -> bool:
+        """Whether this voice is synthesized by the piper module instead of the CLI"""
+        return PIPER_MODULE_AVAILABLE and voice in self.voices and self._load_voice(voice) is not None
+    
+    def preload(self, voice: str, speed: float = 1.0):
+        """Load a voice ahead of its first synthesis"""
+        if voice not in self.voices:
+            return
+        
+        if PIPER_MODULE_AVAILABLE and self._load_voice(voice) is not None:
+            return
+        
+        # Piper loads the model as soon as it starts
+        with self._proc_lock:
+            if self.json_input_supported:
+                self._ensure_process(voice, speed)
+    
+    def _load_voice(self, voice: str) -> Optional["PiperVoice"]:
+        """Return the in-process voice, loading it on first use; None to use the CLI"""
+        model_path = self.voices[voice]
+        with PiperTTS._load_lock:
+            if model_path not in PiperTTS._loaded_voices:
+                try:
+                    loaded = PiperVoice.load(str(model_path), config_path=f"{model_path}.json")
+                    if not hasattr(loaded, "synthesize_stream_raw") and SynthesisConfig is None:
+                        print("Installed piper-tts has no supported synthesis API, using the Piper executable")
+                        loaded = None
+                except Exception as e:
+                    print(f"Failed to load {model_path.name} in-process: {e}")
+                    loaded = None
+                PiperTTS._loaded_voices[model_path] = loaded
+            return PiperTTS._loaded_voices[model_path]
+    
+    def _ensure_process(self, voice: str, speed: float) -> Optional[subprocess.Popen]:
+        """Return a running Piper process for this voice/speed, (re)starting it if needed"""
+        key = (voice, speed)
+        if self._process and self._process.poll() is None and self._process_key == key:
+            return self._process
+        
+        self._terminate_process()
+        
+        # Check for piper executable
+        piper_exe = self._find_piper_executable()
+        if not piper_exe:
+            print("Piper executable not found. Please install Piper.")
+            return None
+        
+        if self._scratch_path is None:
+            fd, self._scratch_path = tempfile.mkstemp(suffix=".wav")
+            os.close(fd)
+        
+        # Piper keeps the model loaded and reads one JSON request per line
+        cmd = [
+            str(piper_exe),
+            "--model", str(self.voices[voice]),
+            "--json-input",
+            "--output_dir", tempfile.gettempdir()
+        ]
+        
+        # Add speed control if supported
+        if speed != 1.0:
+            cmd.extend(["--length_scale", str(1.0 / speed)])
+        
+        # stderr is discarded: Piper logs every utterance there, and an
+        # unread pipe would eventually fill up and stall it
+        self._process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding='utf-8',
+            bufsize=1
+        )
+        self._process_key = key
+        self._process_answered = False
+        return self._process
+    
+    def _terminate_process(self):
+        if not self._process:
+            return
+        try:
+            self._process.stdin.close()
+            self._process.wait(timeout=2)
+        except Exception:
+            self._process.kill()
+        self._process = None
+        self._process_key = None
+    
+    def close(self):
+        """Shut down the Piper process"""
+        with self._proc_lock:
+            self._terminate_process()
+            if self._scratch_path:
+                try:
+                    os.unlink(self._scratch_path)
+                except OSError:
+                    pass
+                self._scratch_path = None
     
     def _find_piper_executable(self) -> Optional[Path]:
         """Find Piper executable in common locations"""
@@ -132,113 +446,264 @@ class TTSWorker(QThread):
     """Background thread for TTS generation"""
     
     progress = pyqtSignal(int)  # Progress percentage
-    finished = pyqtSignal(str)  # Output file path
+    finished = pyqtSignal(bytes, int)  # Combined PCM and sample rate, emitted after playback
     error = pyqtSignal(str)  # Error message
     sentence_started = pyqtSignal(int)  # Sentence index
     
-    def __init__(self, tts_engine: PiperTTS, text: str, voice: str, speed: float):
+    def __init__(self, tts_engine: PiperTTS, text: str, voice: str, speed: float, mode: str = "play"):
         super().__init__()
         self.tts_engine = tts_engine
         self.text = text
         self.voice = voice
         self.speed = speed
-        self.sentences = self._split_sentences(text)
+        # "play" streams sentence by sentence; "export" renders everything
+        # in parallel without playback
+        self.mode = mode
+        self.sentences = split_sentences(text)
         self._stop_requested = False
+        self._paused = False
+        self._stream = None
+        # Stream position of each sentence's first sample, appended as it is
+        # written, and the total written so far; read by the UI thread
+        self.sentence_offsets: List[int] = []
+        self._samples_written = 0
         
-    def _split_sentences(self, text: str) -> List[str]:
-        """Split text into sentences"""
-        # Simple sentence splitter
-        sentences = re.split(r'([.!?]+\s+)', text)
-        result = []
-        current = ""
-        
-        for i, part in enumerate(sentences):
-            current += part
-            if i % 2 == 1:  # Every other part is a delimiter
-                if current.strip():
-                    result.append(current.strip())
-                current = ""
-        
-        if current.strip():
-            result.append(current.strip())
-            
-        return result if result else [text]
-    
     def stop(self):
         self._stop_requested = True
+    
+    def pause(self):
+        self._paused = True
+    
+    def resume(self):
+        self._paused = False
+    
+    def played_samples(self) -> int:
+        """Approximate number of samples that have actually been heard"""
+        stream = self._stream
+        if stream is None or not stream.active:
+            # Stopped or paused streams have played everything written to them
+            return self._samples_written
+        return max(0, self._samples_written - int(stream.latency * stream.samplerate))
         
     def run(self):
-        """Generate TTS for all sentences"""
-        temp_files = []
+        """Play each sentence as soon as it is ready, synthesizing the next one meanwhile"""
+        if self.mode == "export":
+            self._render_all()
+            return
+        
+        segments = []
+        sample_rate = 0
         
         try:
-            for i, sentence in enumerate(self.sentences):
+            # Open the output stream while the first sentence is synthesized
+            config_rate = self.tts_engine.sample_rate(self.voice)
+            if AUDIO_AVAILABLE and config_rate:
+                self._open_stream(config_rate)
+            
+            for i, audio in enumerate(self._iter_audio()):
                 if self._stop_requested:
-                    break
-                    
-                self.sentence_started.emit(i)
-                
-                # Generate audio for this sentence
-                temp_file = tempfile.mktemp(suffix=".wav")
-                if self.tts_engine.synthesize(sentence, self.voice, temp_file, self.speed):
-                    temp_files.append(temp_file)
-                else:
+                    return
+                if audio is None:
                     self.error.emit(f"Failed to synthesize sentence {i}")
                     return
+                pcm, sample_rate = audio
+                segments.append(pcm)
                 
                 # Update progress
                 progress = int((i + 1) / len(self.sentences) * 100)
                 self.progress.emit(progress)
+                
+                self.sentence_started.emit(i)
+                self._play_pcm(pcm, sample_rate)
             
             if self._stop_requested:
-                # Clean up temp files
-                for f in temp_files:
-                    try:
-                        os.unlink(f)
-                    except:
-                        pass
                 return
             
-            # Combine all audio files
-            output_path = tempfile.mktemp(suffix=".wav")
-            if self._combine_wav_files(temp_files, output_path):
-                self.finished.emit(output_path)
-            else:
-                self.error.emit("Failed to combine audio files")
+            # Let the buffered tail of the last sentence play out
+            self._close_stream(drain=True)
             
-            # Clean up temp files
-            for f in temp_files:
-                try:
-                    os.unlink(f)
-                except:
-                    pass
+            # Keep the whole reading in memory so it can be exported
+            self.finished.emit(b"".join(segments), sample_rate)
                     
         except Exception as e:
             self.error.emit(str(e))
+        
+        finally:
+            self._close_stream(drain=False)
     
-    def _combine_wav_files(self, input_files: List[str], output_path: str) -> bool:
-        """Combine multiple WAV files into one"""
-        try:
-            if not input_files:
-                return False
-                
-            # Read first file to get parameters
-            with wave.open(input_files[0], 'rb') as first:
-                params = first.getparams()
+    def _iter_audio(self) -> Iterator[Optional[Tuple[bytes, int]]]:
+        """Yield each sentence's audio in order; None marks a failed sentence"""
+        # One sentence ahead: sentence i+1 is synthesized while sentence i plays
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            ahead = pool.submit(self._synthesize, self.sentences[0])
+            
+            for i in range(len(self.sentences)):
+                audio = ahead.result()
                 
-            # Write combined file
-            with wave.open(output_path, 'wb') as output:
-                output.setparams(params)
+                if audio is None and not self.tts_engine.json_input_supported:
+                    # This Piper can't serve per-sentence requests; render
+                    # the rest in a single run instead of one run per sentence
+                    remaining = len(self.sentences) - i
+                    batch = self.tts_engine.synthesize_batch(
+                        self.sentences[i:], self.voice, self.speed,
+                        on_progress=lambda done: self.progress.emit(int((i + min(done, remaining)) / len(self.sentences) * 100))
+                    )
+                    yield from batch if batch else [None]
+                    return
                 
-                for input_file in input_files:
-                    with wave.open(input_file, 'rb') as infile:
-                        output.writeframes(infile.readframes(infile.getnframes()))
+                if i + 1 < len(self.sentences):
+                    ahead = pool.submit(self._synthesize, self.sentences[i + 1])
+                yield audio
+    
+    def _synthesize(self, sentence: str) -> Optional[Tuple[bytes, int]]:
+        return self.tts_engine.synthesize(sentence, self.voice, self.speed)
+    
+    def _render_all(self):
+        """Synthesize every sentence without playback, across several Piper processes when using the CLI"""
+        try:
+            if self.tts_engine.runs_in_process(self.voice):
+                results = self._render_sequential()
+            elif not self.tts_engine.json_input_supported:
+                results = self.tts_engine.synthesize_batch(
+                    self.sentences, self.voice, self.speed,
+                    on_progress=lambda done: self.progress.emit(int(min(done, len(self.sentences)) / len(self.sentences) * 100))
+                )
+            else:
+                results = self._render_parallel()
             
-            return True
+            if self._stop_requested:
+                return
+            if not results or any(audio is None for audio in results):
+                self.error.emit("Failed to synthesize the text")
+                return
             
+            self.progress.emit(100)
+            self.finished.emit(b"".join(pcm for pcm, _ in results), results[0][1])
+        
         except Exception as e:
-            print(f"Error combining WAV files: {e}")
-            return False
+            self.error.emit(str(e))
+    
+    def _render_sequential(self) -> Optional[List[Optional[Tuple[bytes, int]]]]:
+        """Audio for each sentence in order from the in-process voice, or None if stopped"""
+        # The voice is one onnxruntime session that already spreads each
+        # sentence over every core; more threads would only queue on it
+        results = []
+        for i, sentence in enumerate(self.sentences):
+            if self._stop_requested:
+                return None
+            results.append(self._synthesize(sentence))
+            self.progress.emit(int((i + 1) / len(self.sentences) * 100))
+        return results
+    
+    def _render_parallel(self) -> Optional[List[Optional[Tuple[bytes, int]]]]:
+        """Audio for each sentence in order, or None if stopped"""
+        # Each Piper process runs inference on its own, so threads that only
+        # feed them and wait are enough to keep the CPU busy
+        workers = min(EXPORT_WORKERS, len(self.sentences))
+        engines = [self.tts_engine] + [
+            PiperTTS(str(self.tts_engine.models_dir), voices=self.tts_engine.voices)
+            for _ in range(workers - 1)
+        ]
+        idle = list(engines)
+        idle_lock = threading.Lock()
+        
+        def synthesize(sentence: str) -> Optional[Tuple[bytes, int]]:
+            if self._stop_requested:
+                return None
+            with idle_lock:
+                engine = idle.pop()
+            try:
+                audio = engine.synthesize(sentence, self.voice, self.speed)
+                if audio is None and not engine.json_input_supported:
+                    # Found out this Piper has no --json-input; retry in a batch run
+                    audio = engine.synthesize(sentence, self.voice, self.speed)
+                return audio
+            finally:
+                with idle_lock:
+                    idle.append(engine)
+        
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(synthesize, sentence) for sentence in self.sentences]
+                for done, _ in enumerate(as_completed(futures), 1):
+                    if self._stop_requested:
+                        for future in futures:
+                            future.cancel()
+                        return None
+                    self.progress.emit(int(done / len(futures) * 100))
+                return [future.result() for future in futures]
+        finally:
+            # The shared engine keeps its process for later playback
+            for engine in engines[1:]:
+                engine.close()
+    
+    def _play_pcm(self, pcm: bytes, sample_rate: int):
+        """Write one sentence to the output stream; returns once it is queued or playback is stopped"""
+        if not AUDIO_AVAILABLE:
+            return
+        
+        samples = _apply_fades(np.frombuffer(pcm, dtype=np.int16), sample_rate)
+        
+        # Consecutive writes to one stream play back-to-back without gaps
+        if self._stream is None or self._stream.samplerate != sample_rate:
+            self._close_stream(drain=True)
+            self._open_stream(sample_rate)
+        
+        self.sentence_offsets.append(self._samples_written)
+        for start in range(0, len(samples), PLAYBACK_BLOCK):
+            if self._paused:
+                self._stream.stop()
+                while self._paused and not self._stop_requested:
+                    self.msleep(20)
+                if not self._stop_requested:
+                    self._stream.start()
+            if self._stop_requested:
+                return
+            block = samples[start:start + PLAYBACK_BLOCK]
+            self._stream.write(block)
+            self._samples_written += len(block)
+    
+    def _open_stream(self, sample_rate: int):
+        self._stream = sd.OutputStream(
+            samplerate=sample_rate, channels=1, dtype='int16',
+            blocksize=2048, latency='high'
+        )
+        self._stream.start()
+    
+    def _close_stream(self, drain: bool):
+        if self._stream is None:
+            return
+        if drain:
+            self._stream.stop()  # Returns once the buffered audio has played
+        else:
+            self._stream.abort()  # Drops whatever is still buffered
+        self._stream.close()
+        self._stream = None
+
+
+class ExtractionSignals(QObject):
+    """Signals for ExtractionTask (QRunnable can't define its own)"""
+    
+    result = pyqtSignal(str, str)  # Extracted text, file path
+    error = pyqtSignal(str)  # Error message
+
+
+class ExtractionTask(QRunnable):
+    """Background document text extraction for the global thread pool"""
+    
+    def __init__(self, extract: Callable[[str], str], file_path: str):
+        super().__init__()
+        self.extract = extract
+        self.file_path = file_path
+        self.signals = ExtractionSignals()
+    
+    def run(self):
+        try:
+            text = self.extract(self.file_path)
+        except Exception as e:
+            self.signals.error.emit(str(e))
+            return
+        self.signals.result.emit(text, self.file_path)
 
 
 class SpeechifyDesktop(QMainWindow):
@@ -256,26 +721,53 @@ class SpeechifyDesktop(QMainWindow):
         # TTS Engine
         self.tts_engine = PiperTTS()
         self.tts_worker: Optional[TTSWorker] = None
-        self.current_audio_file: Optional[str] = None
+        # Last complete reading as 16-bit mono PCM, kept for export
+        self.current_audio: Optional[bytes] = None
+        self.current_sample_rate = 0
         self.is_playing = False
         self.is_paused = False
         
         # Sentences for highlighting
-        self.sentences: List[str] = []
-        self.current_sentence_idx = 0
+        self._sentence_spans: List[Tuple[int, int]] = []
+        self.current_sentence_idx = -1
+        
+        # Document import running on the thread pool, if any
+        self._extraction_task: Optional[ExtractionTask] = None
+        
+        # Highlighting follows the audio actually played, polled at ~30 Hz
+        self._highlight_timer = QTimer(self)
+        self._highlight_timer.setInterval(33)
+        self._highlight_timer.timeout.connect(self._update_highlighting)
         
         # Init UI
         self._init_ui()
         self._load_settings()
         
+        # Load the selected voice in the background so the first Play
+        # doesn't wait for the model
+        self._warmup_done = threading.Event()
+        threading.Thread(
+            target=self._warm_up,
+            args=(self.voice_combo.currentText(), self.speed_slider.value() / 10.0),
+            daemon=True
+        ).start()
+        
         # Check for audio support
         if not AUDIO_AVAILABLE:
             QMessageBox.warning(
                 self, 
                 "Audio Not Available",
-                "pygame not installed. Audio playback disabled.\nInstall with: pip install pygame"
+                "sounddevice not installed. Audio playback disabled.\nInstall with: pip install sounddevice numpy"
             )
     
+    def _warm_up(self, voice: str, speed: float):
+        try:
+            self.tts_engine.preload(voice, speed)
+        except Exception as e:
+            print(f"Voice preload failed: {e}")
+        finally:
+            self._warmup_done.set()
+    
     def _init_ui(self):
         """Initialize the user interface"""
         # Central widget
@@ -368,7 +860,9 @@ class SpeechifyDesktop(QMainWindow):
         label.setFont(QFont("Arial", 12, QFont.Weight.Bold))
         layout.addWidget(label)
         
-        self.text_edit = QTextEdit()
+        # Plain-text model: large documents load and lay out far faster than
+        # in a rich-text QTextEdit
+        self.text_edit = QPlainTextEdit()
         self.text_edit.setPlaceholderText(
             "Paste or type your text here...\n\n"
             "Or import a file using the buttons above.\n"
@@ -487,9 +981,12 @@ class SpeechifyDesktop(QMainWindow):
                 self, "Import TXT File", "", "Text Files (*.txt)"
             )
             if file_path:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    text = f.read()
-                self.text_edit.setPlainText(text)
+                if os.stat(file_path).st_size > TXT_STREAM_THRESHOLD:
+                    self._load_large_text(file_path)
+                else:
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        text = f.read()
+                    self.text_edit.setPlainText(text)
                 self.statusBar().showMessage(f"Loaded: {Path(file_path).name}")
         
         elif file_type == "pdf":
@@ -497,73 +994,143 @@ class SpeechifyDesktop(QMainWindow):
                 self, "Import PDF File", "", "PDF Files (*.pdf)"
             )
             if file_path:
-                text = self._extract_pdf_text(file_path)
-                self.text_edit.setPlainText(text)
-                self.statusBar().showMessage(f"Loaded: {Path(file_path).name}")
+                self._start_extraction(self._extract_pdf_text, file_path, "PDF")
         
         elif file_type == "docx":
             file_path, _ = QFileDialog.getOpenFileName(
                 self, "Import DOCX File", "", "Word Files (*.docx)"
             )
             if file_path:
-                text = self._extract_docx_text(file_path)
-                self.text_edit.setPlainText(text)
-                self.statusBar().showMessage(f"Loaded: {Path(file_path).name}")
+                self._start_extraction(self._extract_docx_text, file_path, "DOCX")
         
         elif file_type == "epub":
             file_path, _ = QFileDialog.getOpenFileName(
                 self, "Import EPUB File", "", "EPUB Files (*.epub)"
             )
             if file_path:
-                text = self._extract_epub_text(file_path)
-                self.text_edit.setPlainText(text)
-                self.statusBar().showMessage(f"Loaded: {Path(file_path).name}")
+                self._start_extraction(self._extract_epub_text, file_path, "EPUB")
     
-    def _extract_pdf_text(self, file_path: str) -> str:
-        """Extract text from PDF"""
+    def _load_large_text(self, file_path: str):
+        """Stream a big text file into the editor so its start shows up right away"""
+        # Decodes straight from the mapped file; the incremental decoders
+        # keep characters and \r\n pairs that straddle a chunk boundary intact
+        decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder('utf-8')('replace'), translate=True)
+        
+        # processEvents() below lets the user click around mid-load: keep
+        # Play off a half-loaded text and imports from re-entering this loop
+        play_enabled = self.btn_play.isEnabled()
+        self.btn_play.setEnabled(False)
+        self._set_imports_enabled(False)
+        
+        self.text_edit.clear()
+        self.text_edit.setUndoRedoEnabled(False)
+        self.text_edit.setReadOnly(True)
+        self.statusBar().showMessage(f"Loading {Path(file_path).name}...")
         try:
-            doc = fitz.open(file_path)
-            text = ""
-            for page in doc:
-                text += page.get_text()
-            doc.close()
-            return text
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to read PDF: {e}")
-            return ""
+            with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for start in range(0, len(mm), TXT_STREAM_CHUNK):
+                    chunk = mm[start:start + TXT_STREAM_CHUNK]
+                    final = start + TXT_STREAM_CHUNK >= len(mm)
+                    self.text_edit.moveCursor(QTextCursor.MoveOperation.End)
+                    self.text_edit.insertPlainText(decoder.decode(chunk, final))
+                    QApplication.processEvents()
+        finally:
+            self.text_edit.setReadOnly(False)
+            self.text_edit.setUndoRedoEnabled(True)
+            self._set_imports_enabled(True)
+            self.btn_play.setEnabled(play_enabled)
+        self.text_edit.moveCursor(QTextCursor.MoveOperation.Start)
+    
+    def _set_imports_enabled(self, enabled: bool):
+        for button in (self.btn_import_txt, self.btn_import_pdf, self.btn_import_docx, self.btn_import_epub):
+            button.setEnabled(enabled)
+    
+    def _start_extraction(self, extract: Callable[[str], str], file_path: str, kind: str):
+        """Extract document text on the thread pool so the window stays responsive"""
+        task = ExtractionTask(extract, file_path)
+        task.signals.result.connect(self._on_extraction_done)
+        task.signals.error.connect(lambda msg: self._on_extraction_error(kind, msg))
+        self._extraction_task = task  # Keep the signals object alive until it reports back
+        
+        # One extraction at a time, so a slower earlier one can't replace
+        # the text afterwards or hide the busy bar while another still runs
+        self._set_imports_enabled(False)
+        
+        # Busy indicator
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.setVisible(True)
+        self.statusBar().showMessage(f"Reading {Path(file_path).name}...")
+        
+        QThreadPool.globalInstance().start(task)
+    
+    def _on_extraction_done(self, text: str, file_path: str):
+        self._end_extraction()
+        self.text_edit.setPlainText(text)
+        self.statusBar().showMessage(f"Loaded: {Path(file_path).name}")
+    
+    def _on_extraction_error(self, kind: str, error_msg: str):
+        self._end_extraction()
+        self.statusBar().showMessage("Ready")
+        QMessageBox.critical(self, "Error", f"Failed to read {kind}: {error_msg}")
     
-    def _extract_docx_text(self, file_path: str) -> str:
+    def _end_extraction(self):
+        self._extraction_task = None
+        self._set_imports_enabled(True)
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setVisible(False)
+    
+    @staticmethod
+    def _extract_pdf_text(file_path: str) -> str:
+        """Extract text from PDF"""
+        with fitz.open(file_path) as doc:
+            return "".join([page.get_text() for page in doc])
+    
+    @staticmethod
+    def _extract_docx_text(file_path: str) -> str:
         """Extract text from DOCX"""
-        try:
-            doc = Document(file_path)
-            text = "\n".join([para.text for para in doc.paragraphs])
-            return text
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to read DOCX: {e}")
-            return ""
+        # Stream word/document.xml straight out of the archive rather than
+        # building python-docx's object model for every paragraph
+        paragraphs, runs = [], []
+        run_depth = 0
+        with zipfile.ZipFile(file_path) as archive, archive.open("word/document.xml") as xml:
+            for event, elem in ElementTree.iterparse(xml, events=("start", "end")):
+                tag = elem.tag
+                if tag == _W_RUN:
+                    run_depth += 1 if event == "start" else -1
+                elif event == "start":
+                    continue
+                elif tag == _W_PARAGRAPH:
+                    paragraphs.append("".join(runs))
+                    runs.clear()
+                    elem.clear()
+                elif run_depth:
+                    # Tabs and breaks only count inside runs (w:tab also defines tab stops)
+                    if tag == _W_TEXT:
+                        runs.append(elem.text or "")
+                    elif tag == _W_TAB:
+                        runs.append("\t")
+                    elif tag in _W_BREAKS:
+                        runs.append("\n")
+        return "\n".join(paragraphs)
     
-    def _extract_epub_text(self, file_path: str) -> str:
+    @staticmethod
+    def _extract_epub_text(file_path: str) -> str:
         """Extract text from EPUB"""
-        try:
-            book = epub.read_epub(file_path)
-            text = ""
-            
-            for item in book.get_items():
-                if item.get_type() == ebooklib.ITEM_DOCUMENT:
-                    soup = BeautifulSoup(item.get_content(), 'html.parser')
-                    text += soup.get_text() + "\n\n"
-            
-            return text
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to read EPUB: {e}")
-            return ""
+        book = epub.read_epub(file_path)
+        parts = []
+        
+        for item in book.get_items_of_type(ebooklib.ITEM_DOCUMENT):
+            parts.append(_html_to_text(item.get_content()))
+            parts.append("\n\n")
+        
+        return "".join(parts)
     
     def _play(self):
         """Start or resume playback"""
         if self.is_paused:
             # Resume playback
-            if AUDIO_AVAILABLE and pygame.mixer.music.get_busy() == 0:
-                pygame.mixer.music.unpause()
+            if self.tts_worker:
+                self.tts_worker.resume()
             self.is_paused = False
             self.btn_play.setEnabled(False)
             self.btn_pause.setEnabled(True)
@@ -572,7 +1139,8 @@ class SpeechifyDesktop(QMainWindow):
             return
         
         # Start new playback
-        text = self.text_edit.toPlainText().strip()
+        full_text = self.text_edit.toPlainText()
+        text = full_text.strip()
         if not text:
             QMessageBox.warning(self, "No Text", "Please enter or import text first.")
             return
@@ -585,9 +1153,13 @@ class SpeechifyDesktop(QMainWindow):
         voice = self.voice_combo.currentText()
         speed = self.speed_slider.value() / 10.0
         
-        # Split into sentences for highlighting
-        self.sentences = self._split_text_into_sentences(text)
-        self.current_sentence_idx = 0
+        # Sentence offsets in the editor for highlighting; they line up with
+        # the worker's sentences since stripping the ends doesn't change the split
+        self._sentence_spans = split_sentence_spans(full_text)
+        self.current_sentence_idx = -1
+        
+        # Give a warmup that is nearly done a moment to finish
+        self._warmup_done.wait(timeout=1.0)
         
         # Start TTS generation in background
         self.tts_worker = TTSWorker(self.tts_engine, text, voice, speed)
@@ -596,20 +1168,22 @@ class SpeechifyDesktop(QMainWindow):
         self.tts_worker.error.connect(self._on_tts_error)
         self.tts_worker.sentence_started.connect(self._on_sentence_started)
         self.tts_worker.start()
+        if AUDIO_AVAILABLE and self.highlight_checkbox.isChecked():
+            self._highlight_timer.start()
         
         # Update UI
         self.progress_bar.setVisible(True)
         self.progress_bar.setValue(0)
         self.btn_play.setEnabled(False)
-        self.btn_pause.setEnabled(False)
+        self.btn_pause.setEnabled(True)
         self.btn_stop.setEnabled(True)
         self.statusBar().showMessage("Generating speech...")
         self.is_playing = True
     
     def _pause(self):
         """Pause playback"""
-        if AUDIO_AVAILABLE:
-            pygame.mixer.music.pause()
+        if self.tts_worker:
+            self.tts_worker.pause()
         self.is_paused = True
         self.btn_play.setEnabled(True)
         self.btn_pause.setEnabled(False)
@@ -617,23 +1191,12 @@ class SpeechifyDesktop(QMainWindow):
     
     def _stop(self):
         """Stop playback"""
-        # Stop TTS worker if running
+        # Stop TTS worker (and with it, audio playback) if running
         if self.tts_worker and self.tts_worker.isRunning():
             self.tts_worker.stop()
             self.tts_worker.wait()
         
-        # Stop audio playback
-        if AUDIO_AVAILABLE:
-            pygame.mixer.music.stop()
-        
-        # Clean up
-        if self.current_audio_file and Path(self.current_audio_file).exists():
-            try:
-                os.unlink(self.current_audio_file)
-            except:
-                pass
-        
-        self.current_audio_file = None
+        self.current_audio = None
         self.is_playing = False
         self.is_paused = False
         
@@ -651,33 +1214,27 @@ class SpeechifyDesktop(QMainWindow):
         """Update progress bar"""
         self.progress_bar.setValue(value)
     
-    def _on_tts_finished(self, audio_file: str):
-        """TTS generation complete, start playback"""
-        self.current_audio_file = audio_file
+    def _on_tts_finished(self, pcm: bytes, sample_rate: int):
+        """Playback complete; keep the combined audio for export"""
+        self.current_audio = pcm
+        self.current_sample_rate = sample_rate
+        self.is_playing = False
+        self.is_paused = False
+        self._clear_highlighting()
+        
         self.progress_bar.setVisible(False)
+        self.btn_play.setEnabled(True)
+        self.btn_pause.setEnabled(False)
+        self.btn_stop.setEnabled(False)
         
         if AUDIO_AVAILABLE:
-            try:
-                pygame.mixer.music.load(audio_file)
-                pygame.mixer.music.play()
-                
-                self.btn_pause.setEnabled(True)
-                self.statusBar().showMessage("Playing...")
-                
-                # Start highlighting timer
-                if self.highlight_checkbox.isChecked():
-                    self._start_highlighting()
-                
-            except Exception as e:
-                QMessageBox.critical(self, "Playback Error", f"Failed to play audio: {e}")
-                self._stop()
+            self.statusBar().showMessage("Finished")
         else:
             QMessageBox.information(
                 self, 
                 "Audio Generated", 
-                f"Audio file generated: {audio_file}\n\nInstall pygame for playback."
+                "Audio generated. Use Export to save it.\n\nInstall sounddevice for playback."
             )
-            self._stop()
     
     def _on_tts_error(self, error_msg: str):
         """Handle TTS error"""
@@ -685,101 +1242,58 @@ class SpeechifyDesktop(QMainWindow):
         self._stop()
     
     def _on_sentence_started(self, index: int):
-        """Highlight sentence being generated"""
-        self.current_sentence_idx = index
-    
-    def _split_text_into_sentences(self, text: str) -> List[str]:
-        """Split text into sentences"""
-        sentences = re.split(r'([.!?]+\s+)', text)
-        result = []
-        current = ""
-        
-        for i, part in enumerate(sentences):
-            current += part
-            if i % 2 == 1:
-                if current.strip():
-                    result.append(current.strip())
-                current = ""
-        
-        if current.strip():
-            result.append(current.strip())
-            
-        return result if result else [text]
-    
-    def _start_highlighting(self):
-        """Start real-time highlighting during playback"""
-        # This is a simplified version - in production you'd sync with actual audio timing
-        if not self.sentences:
-            return
-        
-        self.current_sentence_idx = 0
-        self._highlight_timer = QTimer()
-        self._highlight_timer.timeout.connect(self._update_highlighting)
-        
-        # Calculate approximate time per sentence
-        total_chars = sum(len(s) for s in self.sentences)
-        speed = self.speed_slider.value() / 10.0
-        # Rough estimate: 150 words per minute at 1× speed
-        chars_per_minute = 750 * speed
-        interval_ms = int((len(self.sentences[0]) / chars_per_minute) * 60000)
-        
-        self._highlight_timer.start(max(1000, interval_ms))
+        """Sentence handed to the audio output"""
+        if index == 0:
+            self.statusBar().showMessage("Playing...")
     
     def _update_highlighting(self):
-        """Update which sentence is highlighted"""
-        if not AUDIO_AVAILABLE or not pygame.mixer.music.get_busy():
-            if self._highlight_timer:
-                self._highlight_timer.stop()
-            self._clear_highlighting()
-            self._stop()
+        """Highlight the sentence that is currently being heard"""
+        if not self.tts_worker:
             return
         
-        if self.current_sentence_idx >= len(self.sentences):
-            if self._highlight_timer:
-                self._highlight_timer.stop()
+        index = bisect.bisect_right(self.tts_worker.sentence_offsets, self.tts_worker.played_samples()) - 1
+        if index < 0 or index == self.current_sentence_idx or index >= len(self._sentence_spans):
             return
+        self.current_sentence_idx = index
         
-        # Clear previous highlighting
+        # Highlight current sentence as an extra selection, drawn over the
+        # text without touching the document (or its undo history)
+        start, end = self._sentence_spans[self.current_sentence_idx]
+        end = min(end, self.text_edit.document().characterCount() - 1)  # The text may have been edited
         cursor = self.text_edit.textCursor()
-        cursor.select(QTextCursor.SelectionType.Document)
-        fmt = QTextCharFormat()
-        cursor.setCharFormat(fmt)
-        
-        # Highlight current sentence
-        text = self.text_edit.toPlainText()
-        sentence = self.sentences[self.current_sentence_idx]
-        start = text.find(sentence)
-        
-        if start >= 0:
-            cursor = self.text_edit.textCursor()
-            cursor.setPosition(start)
-            cursor.setPosition(start + len(sentence), QTextCursor.MoveMode.KeepAnchor)
-            
-            fmt = QTextCharFormat()
-            fmt.setBackground(QColor(255, 255, 0, 100))  # Yellow highlight
-            cursor.setCharFormat(fmt)
-            
-            # Scroll to current sentence
-            self.text_edit.setTextCursor(cursor)
-            self.text_edit.ensureCursorVisible()
-        
-        self.current_sentence_idx += 1
+        cursor.setPosition(min(start, end))
+        cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+        
+        highlight = QTextEdit.ExtraSelection()
+        highlight.cursor = cursor
+        highlight.format = QTextCharFormat()
+        highlight.format.setBackground(QColor(255, 255, 0, 100))  # Yellow highlight
+        self.text_edit.setExtraSelections([highlight])
+        
+        # Scroll to current sentence
+        cursor = QTextCursor(cursor)
+        cursor.clearSelection()
+        self.text_edit.setTextCursor(cursor)
+        self.text_edit.ensureCursorVisible()
     
     def _clear_highlighting(self):
         """Remove all highlighting"""
-        cursor = self.text_edit.textCursor()
-        cursor.select(QTextCursor.SelectionType.Document)
-        fmt = QTextCharFormat()
-        cursor.setCharFormat(fmt)
+        self._highlight_timer.stop()
+        self.current_sentence_idx = -1
+        self.text_edit.setExtraSelections([])
     
     def _export_audio(self):
         """Export generated audio to file"""
-        if not self.current_audio_file or not Path(self.current_audio_file).exists():
-            QMessageBox.warning(
-                self, 
-                "No Audio", 
-                "Please generate audio first by clicking Play."
-            )
+        if not self.current_audio:
+            if self.is_playing:
+                QMessageBox.warning(
+                    self, 
+                    "No Audio", 
+                    "Please wait for playback to finish, or stop it first."
+                )
+            else:
+                # Nothing played yet: render the whole text, then come back here
+                self._render_for_export()
             return
         
         file_path, _ = QFileDialog.getSaveFileName(
@@ -791,25 +1305,19 @@ class SpeechifyDesktop(QMainWindow):
         
         if file_path:
             try:
-                import shutil
                 if file_path.endswith('.wav'):
-                    shutil.copy(self.current_audio_file, file_path)
+                    self._write_wav(file_path)
                 elif file_path.endswith('.mp3'):
-                    # Convert WAV to MP3 (requires ffmpeg)
-                    try:
-                        subprocess.run([
-                            'ffmpeg', '-i', self.current_audio_file,
-                            '-codec:a', 'libmp3lame', '-qscale:a', '2',
-                            file_path
-                        ], check=True)
-                    except:
+                    # Encode to MP3 (requires ffmpeg), piping the raw PCM in
+                    error = self._encode_mp3(file_path)
+                    if error:
                         QMessageBox.warning(
                             self,
                             "MP3 Conversion Failed",
-                            "ffmpeg not found. Saving as WAV instead."
+                            f"{error}. Saving as WAV instead."
                         )
                         file_path = file_path.replace('.mp3', '.wav')
-                        shutil.copy(self.current_audio_file, file_path)
+                        self._write_wav(file_path)
                 
                 QMessageBox.information(
                     self,
@@ -824,6 +1332,80 @@ class SpeechifyDesktop(QMainWindow):
                     f"Failed to export audio:\n{e}"
                 )
     
+    def _render_for_export(self):
+        """Synthesize the whole text without playing it, using every core"""
+        text = self.text_edit.toPlainText().strip()
+        if not text:
+            QMessageBox.warning(self, "No Text", "Please enter or import text first.")
+            return
+        
+        if not self.tts_engine.voices:
+            QMessageBox.warning(self, "No Voices", "No Piper voices found. Please install voice models.")
+            return
+        
+        voice = self.voice_combo.currentText()
+        speed = self.speed_slider.value() / 10.0
+        
+        self.tts_worker = TTSWorker(self.tts_engine, text, voice, speed, mode="export")
+        self.tts_worker.progress.connect(self._on_tts_progress)
+        self.tts_worker.finished.connect(self._on_export_rendered)
+        self.tts_worker.error.connect(self._on_tts_error)
+        self.tts_worker.start()
+        
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setValue(0)
+        self.btn_play.setEnabled(False)
+        self.btn_pause.setEnabled(False)
+        self.btn_stop.setEnabled(True)
+        self.statusBar().showMessage("Rendering audio for export...")
+        self.is_playing = True
+    
+    def _on_export_rendered(self, pcm: bytes, sample_rate: int):
+        """Export render complete; continue with saving it"""
+        self.current_audio = pcm
+        self.current_sample_rate = sample_rate
+        self.is_playing = False
+        
+        self.progress_bar.setVisible(False)
+        self.btn_play.setEnabled(True)
+        self.btn_stop.setEnabled(False)
+        self.statusBar().showMessage("Audio rendered")
+        
+        self._export_audio()
+    
+    def _encode_mp3(self, path: str) -> Optional[str]:
+        """Encode the current audio to MP3 with ffmpeg; returns an error message on failure"""
+        try:
+            process = subprocess.Popen([
+                'ffmpeg', '-y',
+                '-f', 's16le', '-ar', str(self.current_sample_rate), '-ac', '1', '-i', 'pipe:0',
+                '-codec:a', 'libmp3lame', '-qscale:a', '2',
+                path
+            ], stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        except FileNotFoundError:
+            return "ffmpeg not found"
+        
+        _, stderr = process.communicate(self.current_audio)
+        if process.returncode != 0:
+            lines = stderr.decode('utf-8', errors='replace').strip().splitlines()
+            return f"ffmpeg failed: {lines[-1] if lines else process.returncode}"
+        return None
+    
+    def _write_wav(self, path: str):
+        """Write the current audio to a WAV file in one pass"""
+        # Written next to the target and renamed into place, so a failed
+        # export never leaves a truncated file behind
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(_wav_header(len(self.current_audio), self.current_sample_rate))
+                f.write(self.current_audio)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+    
     def _load_settings(self):
         """Load saved settings"""
         if self.settings.value("voice"):
@@ -847,6 +1429,7 @@ class SpeechifyDesktop(QMainWindow):
         
         # Clean up
         self._stop()
+        self.tts_engine.close()
         
         event.accept()
 
@@ -927,7 +927,7 @@ document.addEventListener('DOMContentLoaded', () => {
             let pdfData;
             
             if (appState.variables.currentUser) {
-                // Use POST endpoint to get PDF data as base64 JSON to bypass download managers like IDM
+                // Use POST endpoint to get the text positions and the URL to load the PDF from
                 const dataUrl = book.content + '/data';  // Append /data to the PDF URL
                 
                 const response = await fetch(dataUrl, {
@@ -945,7 +945,7 @@ document.addEventListener('DOMContentLoaded', () => {
                 
                 const jsonData = await response.json();
                 
-                if (!jsonData.data || jsonData.size === 0) {
+                if (!jsonData.pdf_url || jsonData.size === 0) {
                     throw new Error('PDF file is empty (0 bytes)');
                 }
                 
@@ -969,13 +969,13 @@ document.addEventListener('DOMContentLoaded', () => {
                     showNotification('⚠️ Text selection may not be available for this PDF', 'warning');
                 }
                 
-                // Decode base64 to binary
-                const binaryString = atob(jsonData.data);
-                const bytes = new Uint8Array(binaryString.length);
-                for (let i = 0; i < binaryString.length; i++) {
-                    bytes[i] = binaryString.charCodeAt(i);
+                // Fetch the PDF bytes separately, again by POST as octet-stream
+                // so download managers like IDM don't intercept them
+                const pdfResponse = await fetch(jsonData.pdf_url, { method: 'POST' });
+                if (!pdfResponse.ok) {
+                    throw new Error(`Failed to fetch PDF from ${jsonData.pdf_url}: ${pdfResponse.status}`);
                 }
-                pdfData = bytes.buffer;
+                pdfData = await pdfResponse.arrayBuffer();
                 
             } else if (book.source === 'local' && appState.variables.localBooks[book.id].pdfData) {
                 // Use locally stored PDF data for anonymous users
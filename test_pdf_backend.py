@@ -5,16 +5,18 @@ Test Script for PDF Backend Processing System
 This script tests the PDF processor module to ensure it works correctly.
 
 Usage:
-    python test_pdf_backend.py path/to/sample.pdf
+    python test_pdf_backend.py path/to/sample.pdf [--fast]
+
+--fast counts elements, mapped words and scanned pages on the first page
+only, for quick runs on very long documents.
 """
 
 import sys
-import json
 from pathlib import Path
 
 
-def test_pdf_processor(pdf_path: str):
-    """Test the PDF processor with a sample PDF file."""
+def test_pdf_processor(pdf_path: str, fast: bool = False):
+    """Test the PDF processor with a sample PDF file (fast: validate only the first page)."""
     
     print("=" * 60)
     print("PDF Backend Processing System - Test")
@@ -39,21 +41,14 @@ def test_pdf_processor(pdf_path: str):
         print(f"❌ Failed to import PDF processor: {e}")
         return False
     
-    # Read PDF bytes
-    try:
-        with open(pdf_file, 'rb') as f:
-            pdf_bytes = f.read()
-        print(f"✅ Read {len(pdf_bytes)} bytes from PDF")
-    except Exception as e:
-        print(f"❌ Failed to read PDF file: {e}")
-        return False
-    
     # Process PDF
     print()
     print("🔄 Processing PDF...")
     try:
+        # Hand over the path: MuPDF reads the file itself, so it is never
+        # copied into a Python bytes object
         result = process_pdf_for_interactive_reading(
-            pdf_bytes=pdf_bytes,
+            pdf_path=str(pdf_file),
             options={"chunk_size": 50}
         )
         print("✅ PDF processing completed!")
@@ -86,7 +81,7 @@ def test_pdf_processor(pdf_path: str):
         print(f"      - Page Number: {first_page['page_num']}")
         print(f"      - Dimensions: {first_page['width']} x {first_page['height']}")
         print(f"      - Text Elements: {len(first_page['elements'])}")
-        print(f"      - Words Mapped: {len(first_page.get('word_map', {}))}")
+        print(f"      - Words Mapped: {first_page['word_offsets'][-1]}")
     print()
     
     print(f"📝 Chunk Information:")
@@ -105,7 +100,8 @@ def test_pdf_processor(pdf_path: str):
     if result['pages'] and result['pages'][0]['elements']:
         print(f"🔤 Sample Text Element:")
         sample_elem = result['pages'][0]['elements'][0]
-        print(f"   {json.dumps(sample_elem, indent=6)}")
+        for key, value in sample_elem.items():
+            print(f"      {key}: {value}")
         print()
     
     # Validate structure
@@ -117,6 +113,18 @@ def test_pdf_processor(pdf_path: str):
     checks_passed = 0
     checks_total = 0
     
+    # Gather the per-page figures checks 4 and 6 need in one pass over the
+    # pages (just the first one with fast)
+    checked_pages = result['pages'][:1] if fast else result['pages']
+    counted_elements = 0
+    mapped_words = 0
+    scanned_pages = 0
+    for page in checked_pages:
+        counted_elements += len(page['elements'])
+        mapped_words += page['word_offsets'][-1]
+        if page.get('scanned'):
+            scanned_pages += 1
+    
     # Check 1: Result has required keys
     checks_total += 1
     required_keys = ['status', 'document', 'pages', 'chunks', 'metadata']
@@ -142,12 +150,17 @@ def test_pdf_processor(pdf_path: str):
     else:
         print("❌ No pages processed")
     
-    # Check 4: Elements extracted
+    # Check 4: Elements extracted (scanned pages have none until OCR'd)
     checks_total += 1
-    total_elements = sum(len(page['elements']) for page in result['pages'])
-    if total_elements > 0:
+    total_elements = result['metadata']['total_elements']
+    if not fast and counted_elements != total_elements:
+        print(f"❌ Pages hold {counted_elements} elements but metadata reports {total_elements}")
+    elif counted_elements > 0:
         print(f"✅ Extracted {total_elements} text elements")
         checks_passed += 1
+    elif checked_pages and scanned_pages == len(checked_pages):
+        print(f"✅ All {scanned_pages} pages are scanned images (no text layer, needs OCR)")
+        checks_passed += 1
     else:
         print("❌ No text elements extracted")
     
@@ -161,8 +174,8 @@ def test_pdf_processor(pdf_path: str):
     
     # Check 6: Word mapping exists
     checks_total += 1
-    if result['pages'] and result['pages'][0].get('word_map'):
-        print("✅ Word mapping created")
+    if mapped_words > 0:
+        print(f"✅ Word mapping created ({mapped_words} words)")
         checks_passed += 1
     else:
         print("❌ No word mapping found")
@@ -200,14 +213,14 @@ def test_pdf_processor(pdf_path: str):
 def main():
     """Main entry point."""
     if len(sys.argv) < 2:
-        print("Usage: python test_pdf_backend.py path/to/sample.pdf")
+        print("Usage: python test_pdf_backend.py path/to/sample.pdf [--fast]")
         print()
         print("Example:")
         print("    python test_pdf_backend.py documents/sample.pdf")
         sys.exit(1)
     
     pdf_path = sys.argv[1]
-    success = test_pdf_processor(pdf_path)
+    success = test_pdf_processor(pdf_path, fast="--fast" in sys.argv[2:])
     
     sys.exit(0 if success else 1)
 